@@ -2,6 +2,7 @@
 AI Model configurations for Monopoly agents.
 Each agent represents a different AI model competing in the game.
 """
+import os
 from typing import Dict, List, Any
 
 # Available AI models as agents - each uses a different LLM
@@ -81,22 +82,43 @@ AVAILABLE_AGENTS: List[Dict[str, Any]] = [
 ]
 
 
+# Lookup table built once at import time
+_AGENTS_BY_ID: Dict[str, Dict[str, Any]] = {agent["id"]: agent for agent in AVAILABLE_AGENTS}
+
+# Maximum number of in-flight LLM requests per provider, to stay under rate limits.
+# Override with LLM_MAX_CONCURRENCY_<PROVIDER> (e.g. LLM_MAX_CONCURRENCY_XAI=2);
+# providers not listed here fall back to LLM_MAX_CONCURRENCY (default 8).
+PROVIDER_MAX_CONCURRENCY: Dict[str, int] = {
+    "OpenAI": 8,
+    "Anthropic": 4,
+    "Google": 8,
+    "xAI": 4,
+    "Meta": 4,
+}
+
+
 def get_agent_by_id(agent_id: str) -> Dict[str, Any] | None:
     """Get agent configuration by ID."""
-    for agent in AVAILABLE_AGENTS:
-        if agent["id"] == agent_id:
-            return agent
-    return None
+    return _AGENTS_BY_ID.get(agent_id)
 
 
 def get_agents_by_ids(agent_ids: List[str]) -> List[Dict[str, Any]]:
     """Get multiple agent configurations by IDs."""
-    return [agent for agent in AVAILABLE_AGENTS if agent["id"] in agent_ids]
+    return [_AGENTS_BY_ID[agent_id] for agent_id in agent_ids if agent_id in _AGENTS_BY_ID]
 
 
-def get_system_prompt() -> str:
-    """Generate the system prompt for all agents (same prompt for all models)."""
-    return """You are playing Monopoly. You are a strategic player who wants to win.
+def get_provider_max_concurrency(provider: str) -> int:
+    """Get the maximum number of concurrent LLM requests allowed for a provider."""
+    override = os.environ.get(f"LLM_MAX_CONCURRENCY_{provider.upper()}")
+    if override:
+        return int(override)
+    if provider in PROVIDER_MAX_CONCURRENCY:
+        return PROVIDER_MAX_CONCURRENCY[provider]
+    return int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+
+
+# Shared system prompt for all agents (same prompt for all models)
+_SYSTEM_PROMPT = """You are playing Monopoly. You are a strategic player who wants to win.
 
 RULES REMINDER:
 - Buy properties when you can afford them, especially to complete color groups
@@ -115,3 +137,8 @@ STRATEGY TIPS:
 
 You must respond with ONLY a valid JSON object containing your decision.
 No explanation, no markdown, just the JSON."""
+
+
+def get_system_prompt() -> str:
+    """Get the system prompt for all agents (same prompt for all models)."""
+    return _SYSTEM_PROMPT
@@ -2,18 +2,29 @@
 Game orchestrator that manages AI agent gameplay and broadcasts updates.
 """
 import asyncio
-import json
+import hashlib
+import inspect
 import os
-import re
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Deque, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from dotenv import load_dotenv
 
-from openai import AsyncOpenAI
+import httpx
+import msgspec
+import orjson
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
-from .agent_config import get_agent_by_id, get_system_prompt
+from game.logic.game_engine import PHASE_ACTIONS
+from game.logic.state_diff import broadcast_baseline
+
+from .agent_config import get_agent_by_id, get_provider_max_concurrency, get_system_prompt
 
 # Load environment variables from .env file in backend directory
 backend_dir = Path(__file__).parent.parent
@@ -23,9 +34,40 @@ load_dotenv(env_path)
 print(f"[GameOrchestrator] Looking for .env at: {env_path}")
 print(f"[GameOrchestrator] AI_GATEWAY_API_KEY found: {'Yes' if os.environ.get('AI_GATEWAY_API_KEY') else 'No'}")
 
+# Transient LLM errors worth retrying with backoff
+RETRYABLE_LLM_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+MAX_RETRY_AFTER_SECONDS = 60.0
 
-@dataclass
-class AgentThought:
+# Providers whose gateway routes honor response_format={"type": "json_object"}
+JSON_MODE_PROVIDERS = frozenset({"OpenAI", "xAI", "Google"})
+
+# Static part of the action prompt (response schema), appended to the per-turn state
+_PROMPT_TAIL = """
+Choose your action. Respond with JSON only:
+{"action": "<action_name>", "params": {}, "reasoning": "<brief explanation>"}
+
+For build_house: {"action": "build_house", "params": {"property_position": <position>}, "reasoning": "..."}
+For mortgage/unmortgage: {"action": "<action>", "params": {"property_position": <position>}, "reasoning": "..."}
+For other actions: {"action": "<action_name>", "params": {}, "reasoning": "..."}
+"""
+
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    """Read how long the provider asked us to wait from rate-limit response headers."""
+    if not headers:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0), ("x-ratelimit-reset", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return min(float(value) * scale, MAX_RETRY_AFTER_SECONDS)
+        except ValueError:
+            continue
+    return None
+
+
+class AgentThought(msgspec.Struct):
     """Represents an AI agent's reasoning/thought."""
     agent_id: str
     agent_name: str
@@ -34,6 +76,10 @@ class AgentThought:
     content: str
     action: Optional[str] = None
     params: Optional[Dict] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for broadcasting and history responses."""
+        return msgspec.to_builtins(self)
 
 
 @dataclass
@@ -53,17 +99,61 @@ class GameOrchestrator:
     player_registrar: Optional[Callable] = None
     game_starter: Optional[Callable] = None
     
-    # Thought history
-    thoughts: List[AgentThought] = field(default_factory=list)
+    # Thought history, stored already serialized (see AgentThought.to_dict)
+    thoughts: Deque[Dict[str, Any]] = field(default_factory=deque)
     max_thoughts: int = 100
     
+    # Pacing: minimum seconds between two actions of the same agent (for readability),
+    # and how long to idle when no agent has a decision to make
+    action_delay: float = 1.5
+    poll_interval: float = 0.25
+    _last_action_at: Dict[str, float] = field(default_factory=dict)
+    
+    # Broadcast events waiting to be sent together as one frame
+    _pending_events: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    
+    # Replay cached decisions for identical (model, prompt) pairs instead of calling the LLM.
+    # Off by default since temperature > 0 means some variance is wanted; AGENT_DECISION_CACHE=1 enables it
+    decision_cache_enabled: bool = field(default_factory=lambda: os.environ.get("AGENT_DECISION_CACHE") == "1")
+    decision_cache_size: int = 512
+    _decision_cache: "OrderedDict[str, Dict[str, Any]]" = field(default_factory=OrderedDict)
+    
+    # Per-provider semaphores bounding concurrent LLM requests
+    _semaphores: Dict[str, asyncio.Semaphore] = field(default_factory=dict)
+    
+    # Shared HTTP/2 connection pool for all LLM calls
+    _http: Optional[httpx.AsyncClient] = None
+    
+    # Bounded thread pool for the synchronous game callbacks
+    _executor: Optional[ThreadPoolExecutor] = None
+    
     def __post_init__(self):
+        # Bounded history: appending past max_thoughts drops the oldest thought
+        self.thoughts = deque(self.thoughts, maxlen=self.max_thoughts)
+        
+        # Sync game callbacks (engine, persistence) run here so they never block the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 2),
+            thread_name_prefix="orchestrator-callback",
+        )
+        
+        # The system prompt is constant, fetch it once
+        self._system_prompt = get_system_prompt()
+        
         # Initialize AI client
         gateway_key = os.environ.get("AI_GATEWAY_API_KEY") or os.environ.get("OPENAI_API_KEY")
         if gateway_key:
+            # All agents hit the same gateway: one pooled HTTP/2 client, sized for
+            # concurrent agents, avoids a TCP/TLS handshake per LLM call
+            self._http = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
             self.ai_client = AsyncOpenAI(
                 base_url="https://ai-gateway.vercel.sh/v1",
                 api_key=gateway_key,
+                http_client=self._http,
                 default_headers={
                     "x-title": "Monopoly-MCP-Agent",
                     "http-referer": "https://monopoly.local",
@@ -85,40 +175,100 @@ class GameOrchestrator:
         self.player_registrar = player_registrar
         self.game_starter = game_starter
     
-    def _add_thought(self, thought: AgentThought):
-        """Add a thought to history and broadcast it."""
-        self.thoughts.append(thought)
-        if len(self.thoughts) > self.max_thoughts:
-            self.thoughts = self.thoughts[-self.max_thoughts:]
+    async def _run_callback(self, callback: Callable, *args):
+        """Await a game callback: coroutine callbacks directly, sync ones in the thread pool."""
+        if inspect.iscoroutinefunction(callback):
+            return await callback(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(callback, *args))
+    
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Get (or lazily create) the concurrency limiter for a provider."""
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(get_provider_max_concurrency(provider))
+            self._semaphores[provider] = semaphore
+        return semaphore
+    
+    @retry(
+        wait=wait_random_exponential(min=1, max=30),
+        stop=stop_after_attempt(5),
+        retry=retry_if_exception_type(RETRYABLE_LLM_ERRORS),
+        reraise=True,
+    )
+    async def _call_llm(self, provider: str, model_id: str, messages: List[Dict[str, str]]) -> str:
+        """Call the chat completion API and return the response content.
         
-        # Broadcast the thought
+        Transient failures are retried with backoff.
+        """
+        # JSON mode guarantees a bare JSON object, so no fence cleanup is needed downstream
+        extra = {"response_format": {"type": "json_object"}} if provider in JSON_MODE_PROVIDERS else {}
+        try:
+            # Bound concurrent requests per provider
+            async with self._get_semaphore(provider):
+                response = await self.ai_client.chat.completions.create(
+                    model=model_id,
+                    messages=messages,
+                    temperature=0.3,
+                    **extra
+                )
+                return response.choices[0].message.content
+        except RateLimitError as e:
+            # Honor the provider's Retry-After on top of the exponential backoff
+            retry_after = _retry_after_seconds(e.response.headers if e.response else None)
+            if retry_after:
+                await asyncio.sleep(retry_after)
+            raise
+    
+    def _get_cached_decision(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached decision, marking it most recently used."""
+        decision = self._decision_cache.get(cache_key)
+        if decision is not None:
+            self._decision_cache.move_to_end(cache_key)
+        return decision
+    
+    def _cache_decision(self, cache_key: str, decision: Dict[str, Any]):
+        """Cache a parsed decision, evicting the least recently used past decision_cache_size."""
+        self._decision_cache[cache_key] = decision
+        self._decision_cache.move_to_end(cache_key)
+        while len(self._decision_cache) > self.decision_cache_size:
+            self._decision_cache.popitem(last=False)
+    
+    def _queue_event(self, update_type: str, data: Dict[str, Any]):
+        """Queue a broadcast event; it is sent with the others on the next flush."""
         if self.broadcast_callback:
-            self.broadcast_callback("agent_thought", {
-                "thought": {
-                    "agent_id": thought.agent_id,
-                    "agent_name": thought.agent_name,
-                    "timestamp": thought.timestamp,
-                    "thought_type": thought.thought_type,
-                    "content": thought.content,
-                    "action": thought.action,
-                    "params": thought.params
-                }
+            self._pending_events.append((update_type, data))
+    
+    def _flush_events(self):
+        """Send queued events in one frame: as-is if there is one, else as a 'batch'."""
+        if not self._pending_events:
+            return
+        events = self._pending_events
+        self._pending_events = []
+        
+        if not self.broadcast_callback:
+            return
+        if len(events) == 1:
+            self.broadcast_callback(*events[0])
+        else:
+            self.broadcast_callback("batch", {
+                "events": [{"type": update_type, **data} for update_type, data in events]
             })
     
+    def _add_thought(self, thought: AgentThought):
+        """Add a thought to history and broadcast it."""
+        # Serialize once; the same dict serves history reads and the broadcast
+        thought_dict = thought.to_dict()
+        self.thoughts.append(thought_dict)
+        
+        # Broadcast the thought (with the next flush)
+        self._queue_event("agent_thought", {
+            "thought": thought_dict
+        })
+    
     def get_recent_thoughts(self, limit: int = 20) -> List[Dict]:
         """Get recent thoughts for display."""
-        return [
-            {
-                "agent_id": t.agent_id,
-                "agent_name": t.agent_name,
-                "timestamp": t.timestamp,
-                "thought_type": t.thought_type,
-                "content": t.content,
-                "action": t.action,
-                "params": t.params
-            }
-            for t in self.thoughts[-limit:]
-        ]
+        return list(islice(self.thoughts, max(0, len(self.thoughts) - limit), None))
     
     async def start_game(self, agent_ids: List[str]) -> Dict[str, Any]:
         """Start a new game with selected agents."""
@@ -135,7 +285,8 @@ class GameOrchestrator:
             return {"error": "AI client not configured. Set AI_GATEWAY_API_KEY or OPENAI_API_KEY"}
         
         self.selected_agents = agent_ids
-        self.thoughts = []
+        self.thoughts.clear()
+        broadcast_baseline.reset()
         
         # Get agent configs
         agents = [get_agent_by_id(aid) for aid in agent_ids]
@@ -144,7 +295,7 @@ class GameOrchestrator:
         # Register agents
         for agent in agents:
             if agent and self.player_registrar:
-                result = self.player_registrar(agent["name"])
+                result = await self._run_callback(self.player_registrar, agent["name"])
                 self._add_thought(AgentThought(
                     agent_id=agent["id"],
                     agent_name=agent["name"],
@@ -154,15 +305,15 @@ class GameOrchestrator:
                 ))
                 # Broadcast updated state after each registration
                 if self.broadcast_callback and self.state_getter:
-                    self.broadcast_callback("player_registered", {
+                    self._queue_event("player_registered", {
                         "player_name": agent["name"],
                         "message": result,
-                        "state": self.state_getter()
+                        "state": await self._run_callback(self.state_getter)
                     })
         
         # Start the game
         if self.game_starter:
-            result = self.game_starter()
+            result = await self._run_callback(self.game_starter)
             self._add_thought(AgentThought(
                 agent_id="system",
                 agent_name="System",
@@ -172,14 +323,17 @@ class GameOrchestrator:
             ))
             # Broadcast game started with full state
             if self.broadcast_callback and self.state_getter:
-                self.broadcast_callback("game_started", {
+                self._queue_event("game_started", {
                     "message": result,
-                    "state": self.state_getter()
+                    "state": await self._run_callback(self.state_getter)
                 })
         
+        # Registration and game start go out in a single frame
+        self._flush_events()
+        
         # Start the game loop in background
         self.is_running = True
-        self.game_task = asyncio.create_task(self._game_loop())
+        self.game_task = asyncio.create_task(self._game_loop(), name="orchestrator-game-loop")
         
         return {
             "success": True,
@@ -204,30 +358,50 @@ class GameOrchestrator:
             thought_type="action_result",
             content="Game stopped by user"
         ))
+        self._flush_events()
         
         return {"success": True, "message": "Game stopped"}
     
+    async def aclose(self):
+        """Stop any running game and release the HTTP and thread pools (on server shutdown)."""
+        if self.is_running:
+            self.stop_game()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
     def _clean_json_content(self, content: str) -> str:
         """Remove markdown code blocks from LLM response."""
-        if "```" in content:
-            match = re.search(r"```(?:json)?(.*?)```", content, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-        return content.strip()
+        # Slice out the first fenced block directly instead of running a regex
+        start = content.find("```")
+        if start < 0:
+            return content.strip()
+        end = content.find("```", start + 3)
+        if end < 0:
+            return content.strip()
+        body = content[start + 3:end]
+        if body.startswith("json"):
+            body = body[4:]
+        return body.strip()
     
     def _get_action_prompt(self, game_state: Dict, agent_name: str, available_actions: List[str]) -> str:
         """Build the action prompt for an agent."""
         player_info = game_state["players"].get(agent_name, {})
         
-        other_players_txt = ""
-        for name, info in game_state["players"].items():
-            if name != agent_name:
-                other_players_txt += f"- {name}: ${info['money']}, {len(info.get('properties', []))} properties\n"
+        other_players_txt = "".join(
+            f"- {name}: ${info['money']}, {len(info.get('properties', []))} properties\n"
+            for name, info in game_state["players"].items()
+            if name != agent_name
+        )
         
         recent_msgs = game_state.get("recent_messages", [])
         recent_history = "\n".join(recent_msgs[-5:]) if isinstance(recent_msgs, list) else "No recent history."
         
-        return f"""
+        # Only the state-dependent head is formatted per call; the schema tail is static
+        head = f"""
 GAME STATE:
 - Your name: {agent_name}
 - Your money: ${player_info.get('money', 0)}
@@ -246,23 +420,19 @@ AVAILABLE ACTIONS: {available_actions}
 
 RECENT EVENTS:
 {recent_history}
-
-Choose your action. Respond with JSON only:
-{{"action": "<action_name>", "params": {{}}, "reasoning": "<brief explanation>"}}
-
-For build_house: {{"action": "build_house", "params": {{"property_position": <position>}}, "reasoning": "..."}}
-For mortgage/unmortgage: {{"action": "<action>", "params": {{"property_position": <position>}}, "reasoning": "..."}}
-For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..."}}
 """
+        return head + _PROMPT_TAIL
     
-    async def _agent_think_and_act(self, agent_config: Dict, game_state: Dict, available_actions: List[str]):
-        """Have an agent think and take an action."""
+    async def _agent_think_and_act(
+        self, agent_config: Dict, game_state: Dict, available_actions: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Have an agent think and take an action. Returns the post-action game state, if fetched."""
         agent_name = agent_config["name"]
         agent_id = agent_config["id"]
         model_id = agent_config.get("model_id", "openai/gpt-4o")
         
-        # Get system prompt (same for all models - they compete on reasoning ability)
-        system_prompt = get_system_prompt()
+        # System prompt is the same for all models - they compete on reasoning ability
+        system_prompt = self._system_prompt
         user_prompt = self._get_action_prompt(game_state, agent_name, available_actions)
         
         # Add thinking thought
@@ -273,21 +443,34 @@ For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..
             thought_type="reasoning",
             content=f"🤔 Analyzing game state... Phase: {game_state.get('phase')}, Available actions: {available_actions} [Model: {model_id}]"
         ))
+        # Show the "thinking" thought now rather than after the LLM responds
+        self._flush_events()
         
+        updated_state = None
         try:
-            # Call AI with the agent's specific model
-            response = await self.ai_client.chat.completions.create(
-                model=model_id,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3
-            )
+            decision = None
+            if self.decision_cache_enabled:
+                cache_key = hashlib.blake2b((model_id + user_prompt).encode(), digest_size=16).hexdigest()
+                decision = self._get_cached_decision(cache_key)
             
-            raw_content = response.choices[0].message.content
-            cleaned_content = self._clean_json_content(raw_content)
-            decision = json.loads(cleaned_content)
+            if decision is None:
+                provider = agent_config.get("provider", "default")
+                # Call AI with the agent's specific model
+                raw_content = await self._call_llm(
+                    provider,
+                    model_id,
+                    [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                )
+                
+                if provider not in JSON_MODE_PROVIDERS:
+                    raw_content = self._clean_json_content(raw_content)
+                decision = orjson.loads(raw_content)
+                
+                if self.decision_cache_enabled:
+                    self._cache_decision(cache_key, decision)
             
             action_name = decision.get("action")
             params = decision.get("params", {})
@@ -306,10 +489,10 @@ For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..
             
             # Execute action
             if self.action_handler:
-                result = self.action_handler(agent_name, action_name, params)
+                result = await self._run_callback(self.action_handler, agent_name, action_name, params)
                 
                 # Add result thought
-                result_str = json.dumps(result) if isinstance(result, dict) else str(result)
+                result_str = orjson.dumps(result).decode() if isinstance(result, dict) else str(result)
                 self._add_thought(AgentThought(
                     agent_id=agent_id,
                     agent_name=agent_name,
@@ -318,17 +501,21 @@ For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..
                     content=f"Action result: {result_str[:200]}"
                 ))
                 
+                # Fetch the post-action state once; it is broadcast and reused by the game loop
+                if self.state_getter:
+                    updated_state = await self._run_callback(self.state_getter)
+                
                 # Broadcast updated game state to all clients
-                if self.broadcast_callback and self.state_getter:
-                    updated_state = self.state_getter()
-                    self.broadcast_callback("action_result", {
+                if self.broadcast_callback and updated_state is not None:
+                    self._queue_event("action_result", {
                         "player_name": agent_name,
                         "action": action_name,
                         "result": result,
-                        "state": updated_state
+                        # Diffed against the baseline shared with the route broadcasts
+                        **broadcast_baseline.payload(updated_state)
                     })
                 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             self._add_thought(AgentThought(
                 agent_id=agent_id,
                 agent_name=agent_name,
@@ -344,6 +531,51 @@ For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..
                 thought_type="error",
                 content=f"Error: {str(e)}"
             ))
+        
+        # Decision, result and updated state go out in a single frame
+        self._flush_events()
+        return updated_state
+    
+    def _pending_decision(
+        self, game_state: Dict, agent_lookup: Dict[str, Dict]
+    ) -> Optional[Tuple[Dict, List[str]]]:
+        """(agent_config, available_actions) for the agent that must decide now, if any."""
+        # Only the current player can act in Monopoly
+        current_player_name = game_state.get("current_player")
+        agent_config = agent_lookup.get(current_player_name)
+        if agent_config is None:
+            return None
+        
+        # We need to check what actions are available (GamePhase is a StrEnum, so the
+        # engine's table is keyed by the phase strings in the state)
+        phase = game_state.get("phase", "")
+        available_actions = list(PHASE_ACTIONS.get(phase, ()))
+        
+        if phase == "in_jail":
+            player_info = game_state["players"].get(current_player_name, {})
+            if player_info.get("jail_cards", 0) > 0:
+                available_actions.append("use_jail_card")
+        
+        if not available_actions:
+            return None
+        return agent_config, available_actions
+    
+    async def _paced_think_and_act(
+        self, agent_config: Dict, game_state: Dict, available_actions: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Debounce per agent so consecutive actions stay readable, then think and act."""
+        loop = asyncio.get_running_loop()
+        agent_id = agent_config["id"]
+        last = self._last_action_at.get(agent_id)
+        if last is not None:
+            remaining = self.action_delay - (loop.time() - last)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        
+        try:
+            return await self._agent_think_and_act(agent_config, game_state, available_actions)
+        finally:
+            self._last_action_at[agent_id] = loop.time()
     
     async def _game_loop(self):
         """Main game loop that runs agent turns."""
@@ -351,17 +583,27 @@ For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..
         max_turns = 200
         
         # Build agent lookup
-        agent_lookup = {get_agent_by_id(aid)["name"]: get_agent_by_id(aid) for aid in self.selected_agents}
+        agent_lookup = {}
+        for aid in self.selected_agents:
+            agent_config = get_agent_by_id(aid)
+            agent_lookup[agent_config["name"]] = agent_config
+        self._last_action_at.clear()
+        
+        # State fetched right after the last action, reused instead of fetching again
+        next_state = None
         
         while self.is_running and turn_count < max_turns:
-            await asyncio.sleep(1.5)  # Pause between actions for readability
-            
             try:
                 # Get game state
                 if not self.state_getter:
+                    await asyncio.sleep(self.poll_interval)
                     continue
-                    
-                game_state = self.state_getter()
+                
+                if next_state is not None:
+                    game_state = next_state
+                else:
+                    game_state = await self._run_callback(self.state_getter)
+                next_state = None
                 
                 # Check for game over
                 if game_state.get("phase") == "game_over":
@@ -373,42 +615,22 @@ For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..
                         content="🏆 GAME OVER!"
                     ))
                     # Broadcast game over state
-                    if self.broadcast_callback:
-                        self.broadcast_callback("state_update", {
-                            "state": game_state
-                        })
+                    self._queue_event("state_update", {
+                        "state": game_state
+                    })
+                    self._flush_events()
                     self.is_running = False
                     break
                 
-                # Get current player
-                current_player_name = game_state.get("current_player")
-                
-                if current_player_name not in agent_lookup:
+                # The agent that needs to decide, with its available actions
+                pending = self._pending_decision(game_state, agent_lookup)
+                if pending is None:
+                    await asyncio.sleep(self.poll_interval)
                     continue
                 
-                agent_config = agent_lookup[current_player_name]
-                
-                # Get available actions from game engine
-                from game.logic.game_engine import MonopolyGameEngine
-                # We need to check what actions are available
-                phase = game_state.get("phase", "")
-                available_actions = []
-                
-                if phase == "waiting_for_roll":
-                    available_actions = ["roll_dice_and_move"]
-                elif phase == "in_jail":
-                    available_actions = ["roll_for_doubles", "pay_jail_bail"]
-                    player_info = game_state["players"].get(current_player_name, {})
-                    if player_info.get("jail_cards", 0) > 0:
-                        available_actions.append("use_jail_card")
-                elif phase == "waiting_for_buy_decision":
-                    available_actions = ["buy_property", "decline_purchase"]
-                elif phase == "turn_complete":
-                    available_actions = ["end_turn"]
-                
-                if available_actions:
-                    await self._agent_think_and_act(agent_config, game_state, available_actions)
-                    turn_count += 1
+                agent_config, available_actions = pending
+                next_state = await self._paced_think_and_act(agent_config, game_state, available_actions)
+                turn_count += 1
                     
             except asyncio.CancelledError:
                 break
@@ -420,6 +642,7 @@ For other actions: {{"action": "<action_name>", "params": {{}}, "reasoning": "..
                     thought_type="error",
                     content=f"Game loop error: {str(e)}"
                 ))
+                self._flush_events()
                 await asyncio.sleep(2)
         
         self.is_running = False
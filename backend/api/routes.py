@@ -2,46 +2,204 @@
 FastAPI routes for the Monopoly game API with WebSocket support.
 """
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, List, Set
+from fastapi.responses import JSONResponse, Response
+from typing import Awaitable, Callable, Deque, Dict, Any, List, Optional, Set, Tuple
+from collections import deque
 import asyncio
 import json
 
+import orjson
+from websockets.exceptions import ConnectionClosed
+
+from game.logic.state_diff import broadcast_baseline
+
 router = APIRouter(prefix="/api", tags=["game"])
 
+# A client whose send takes longer than this is dropped rather than stalling the broadcast
+SEND_TIMEOUT = 5.0
+# Frames queued per client before the oldest stateless one is dropped
+SEND_QUEUE_SIZE = 64
+
+# Errors that just mean the client went away; anything else is logged
+CLIENT_GONE_ERRORS = (WebSocketDisconnect, ConnectionClosed, ConnectionResetError, BrokenPipeError)
+
+
+def _encode_message(message: Dict[str, Any], state_bytes: Optional[bytes] = None) -> str:
+    """Encode a message as JSON text, splicing in already-encoded state under "state"."""
+    if (
+        _state_revision_getter is not None
+        and "state_revision" not in message
+        and _carries_state(message, state_bytes)
+    ):
+        # Clients compare this against later frames to notice a state they missed
+        message = {**message, "state_revision": _state_revision_getter()}
+    payload = orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+    if state_bytes is not None:
+        payload = payload[:-1] + (b',"state":' if message else b'"state":') + state_bytes + b'}'
+    return payload.decode()
+
+
+def _note_full_state(message: Dict[str, Any], state_bytes: Optional[bytes]):
+    """Keep the shared patch baseline in step with a frame about to reach every client."""
+    if state_bytes is not None:
+        # Encoded state has no dict to diff against, so the next flush sends a full one
+        broadcast_baseline.reset()
+        return
+    # Clients end up on whatever the last state or patch in the frame gives them
+    events = [message, *reversed(message.get("events", ()))]
+    for event in events:
+        if "state" in event:
+            broadcast_baseline.mark_full(event["state"])
+            return
+        if "patch" in event:
+            # Diffed by broadcast_baseline.payload, which already moved the baseline
+            return
+
+
+def _carries_state(message: Dict[str, Any], state_bytes: Optional[bytes]) -> bool:
+    """Whether a frame holds a state or patch (directly or in a batch) clients depend on."""
+    if state_bytes is not None or "state" in message or "patch" in message:
+        return True
+    events = message.get("events")
+    return bool(events) and any("state" in e or "patch" in e for e in events)
+
+
+class ClientSender:
+    """Bounded outgoing queue for one websocket, drained by its own writer task.
+    
+    A slow client can hold at most SEND_QUEUE_SIZE frames; beyond that the oldest frame
+    without state is dropped. State frames are never dropped on their own: if the queue
+    holds nothing else it is cleared and the client gets a full state_update next.
+    """
+    
+    def __init__(self, websocket: WebSocket, on_error: Callable[[WebSocket], None]):
+        self.websocket = websocket
+        self._on_error = on_error
+        self._loop = asyncio.get_running_loop()
+        # (payload, carries_state) pairs
+        self._frames: Deque[Tuple[str, bool]] = deque()
+        self._ready = asyncio.Event()
+        self._needs_resync = False
+        self._task = asyncio.create_task(self._run(), name=f"ws-sender-{id(websocket):x}")
+    
+    def _next_payload(self) -> str:
+        if self._needs_resync:
+            self._needs_resync = False
+            # This client is about to hold a newer state than the shared patch baseline
+            broadcast_baseline.reset()
+            return _encode_message({"type": "state_update"}, get_state_bytes())
+        return self._frames.popleft()[0]
+    
+    async def _run(self):
+        try:
+            while True:
+                if not self._frames and not self._needs_resync:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                payload = self._next_payload()
+                await asyncio.wait_for(self.websocket.send_text(payload), SEND_TIMEOUT)
+        except (*CLIENT_GONE_ERRORS, TimeoutError):
+            # Disconnected or stalled past SEND_TIMEOUT
+            await self._drop()
+        except Exception as e:
+            print(f"WebSocket send error: {e!r}")
+            await self._drop()
+    
+    async def _drop(self):
+        """Close the socket so the client reconnects and resyncs, then unregister it."""
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1011), SEND_TIMEOUT)
+        except Exception:
+            # Already closed, or too stalled to take the close frame
+            pass
+        # Last, since unregistering cancels this task
+        self._on_error(self.websocket)
+    
+    def _make_room(self):
+        frames = self._frames
+        for i, (_, carries_state) in enumerate(frames):
+            if not carries_state:
+                del frames[i]
+                return
+        # Only state frames are queued: replace them all with a fresh full state
+        frames.clear()
+        if _game_state_getter is not None:
+            self._needs_resync = True
+    
+    def _enqueue(self, payload: str, carries_state: bool):
+        if len(self._frames) >= SEND_QUEUE_SIZE:
+            self._make_room()
+        self._frames.append((payload, carries_state))
+        self._ready.set()
+    
+    def send(self, payload: str, carries_state: bool = False):
+        """Queue a frame without waiting for it to be written."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._enqueue(payload, carries_state)
+        else:
+            # Broadcasts bridged from another thread or loop
+            self._loop.call_soon_threadsafe(self._enqueue, payload, carries_state)
+    
+    def close(self):
+        self._task.cancel()
+
 
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # Keyed by id() for O(1) connect/disconnect
+        self.active_connections: Dict[int, ClientSender] = {}
+        # Serving loop; send queues and the patch baseline are only touched on it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
     
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self._loop = asyncio.get_running_loop()
+        self.active_connections[id(websocket)] = ClientSender(websocket, self.disconnect)
     
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-    
-    async def broadcast(self, message: Dict[str, Any]):
-        """Broadcast a message to all connected clients."""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
+        sender = self.active_connections.pop(id(websocket), None)
+        if sender is not None:
+            sender.close()
+    
+    async def broadcast(self, message: Dict[str, Any], state_bytes: Optional[bytes] = None):
+        """Broadcast a message to all connected clients, with pre-encoded state if given."""
+        self.broadcast_nowait(message, state_bytes)
+    
+    def broadcast_nowait(self, message: Dict[str, Any], state_bytes: Optional[bytes] = None):
+        """Queue a broadcast to all connected clients; usable from plain callbacks."""
+        if not self.active_connections:
+            return
         
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
-    
-    async def send_personal(self, websocket: WebSocket, message: Dict[str, Any]):
-        """Send a message to a specific client."""
-        try:
-            await websocket.send_json(message)
-        except Exception:
-            self.disconnect(websocket)
+        loop = self._loop
+        if loop is not None and asyncio._get_running_loop() is not loop:
+            # Bridged from another thread or loop
+            loop.call_soon_threadsafe(self.broadcast_nowait, message, state_bytes)
+            return
+        
+        _note_full_state(message, state_bytes)
+        
+        # Encode once and queue the same text frame for every client
+        payload = _encode_message(message, state_bytes)
+        carries_state = _carries_state(message, state_bytes)
+        for sender in list(self.active_connections.values()):
+            sender.send(payload, carries_state)
+    
+    async def send_personal(
+        self, websocket: WebSocket, message: Dict[str, Any], state_bytes: Optional[bytes] = None
+    ):
+        """Send a message to a specific client, with pre-encoded state if given."""
+        sender = self.active_connections.get(id(websocket))
+        if sender is not None:
+            if state_bytes is not None:
+                # This client now holds a newer state than the patch baseline
+                broadcast_baseline.reset()
+            sender.send(_encode_message(message, state_bytes), _carries_state(message, state_bytes))
 
 
 # Global connection manager instance
@@ -53,20 +211,90 @@ _game_state_getter = None
 _game_action_handler = None
 _player_registrar = None
 _game_starter = None
+_state_revision_getter = None
+
+
+# Encoded game state, reused until a mutating handler bumps the version
+_state_version = 0
+_cached_state_version = -1
+_cached_state_bytes: Optional[bytes] = None
+
+
+def invalidate_state_cache():
+    """Mark the cached game state stale; call after every state mutation."""
+    global _state_version
+    _state_version += 1
+
+
+def get_state_bytes(
+    default: Optional[Dict[str, Any]] = None, snapshot: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """
+    Get the current game state as JSON bytes, re-encoding only after a mutation.
+    A snapshot the caller already fetched is encoded instead of fetching the state again.
+    """
+    global _cached_state_version, _cached_state_bytes
+    if _game_state_getter is None:
+        return orjson.dumps(default if default is not None else {})
+    
+    version = _state_version
+    if _cached_state_bytes is None or _cached_state_version != version:
+        state = snapshot if snapshot is not None else _game_state_getter()
+        _cached_state_bytes = orjson.dumps(state, option=orjson.OPT_NON_STR_KEYS)
+        _cached_state_version = version
+    return _cached_state_bytes
+
+
+# Action bursts (e.g. from the agent orchestrator) mark the state dirty; a single
+# state_update goes out once no flush is pending for STATE_BROADCAST_DELAY seconds
+STATE_BROADCAST_DELAY = 0.03
+_state_flush_handle: Optional[asyncio.TimerHandle] = None
+
+# Debounced flushes send a state_patch against the last state everyone was sent (the
+# baseline shared with the agent orchestrator), or a periodic full state_update
+
+
+def _flush_state():
+    """Broadcast the current state once for all changes since the last flush."""
+    global _state_flush_handle
+    _state_flush_handle = None
+    if _game_state_getter is None:
+        return
+    
+    state = _game_state_getter()
+    payload = broadcast_baseline.payload(state)
+    if "patch" in payload:
+        if payload["patch"]:
+            manager.broadcast_nowait({"type": "state_patch", **payload})
+        return
+    
+    manager.broadcast_nowait({"type": "state_update"}, get_state_bytes(snapshot=state))
+    # Sending pre-encoded state reset the baseline; it is this state
+    broadcast_baseline.mark_full(state)
+
+
+def mark_state_dirty():
+    """Schedule a debounced state_update broadcast."""
+    global _state_flush_handle
+    if _state_flush_handle is None:
+        _state_flush_handle = asyncio.get_running_loop().call_later(STATE_BROADCAST_DELAY, _flush_state)
 
 
 def setup_game_handlers(
     state_getter,
     action_handler,
     player_registrar,
-    game_starter
+    game_starter,
+    revision_getter=None
 ):
-    """Setup handlers from mcp_server state."""
+    """Setup handlers from mcp_server state; all but the getters are coroutine functions."""
     global _game_state_getter, _game_action_handler, _player_registrar, _game_starter
+    global _state_revision_getter
     _game_state_getter = state_getter
     _game_action_handler = action_handler
     _player_registrar = player_registrar
     _game_starter = game_starter
+    _state_revision_getter = revision_getter
 
 
 @router.get("/status")
@@ -75,8 +303,8 @@ async def get_game_status():
     if _game_state_getter is None:
         raise HTTPException(status_code=500, detail="Game handlers not initialized")
     
-    state = _game_state_getter()
-    return JSONResponse(content=state)
+    # Served from the encoded-state cache; only re-fetched after a mutation
+    return Response(content=get_state_bytes(), media_type="application/json")
 
 
 @router.get("/players")
@@ -97,7 +325,7 @@ async def register_player(player_name: str):
     if _player_registrar is None:
         raise HTTPException(status_code=500, detail="Game handlers not initialized")
     
-    result = _player_registrar(player_name)
+    result = await _player_registrar(player_name)
     
     # Broadcast player registration
     await manager.broadcast({
@@ -115,20 +343,19 @@ async def start_game():
     if _game_starter is None:
         raise HTTPException(status_code=500, detail="Game handlers not initialized")
     
-    result = _game_starter()
+    result = await _game_starter()
     
     # Broadcast game start
     await manager.broadcast({
         "type": "game_started",
-        "message": result,
-        "state": _game_state_getter() if _game_state_getter else {}
-    })
+        "message": result
+    }, get_state_bytes())
     
     return JSONResponse(content={"result": result})
 
 
 @router.post("/game/action")
-async def perform_action(player_name: str, action: str, params: Dict[str, Any] = None):
+async def perform_action(player_name: str, action: str, params: Optional[Dict[str, Any]] = None):
     """Perform a game action."""
     if _game_action_handler is None:
         raise HTTPException(status_code=500, detail="Game handlers not initialized")
@@ -136,16 +363,16 @@ async def perform_action(player_name: str, action: str, params: Dict[str, Any] =
     if params is None:
         params = {}
     
-    result = _game_action_handler(player_name, action, params)
+    result = await _game_action_handler(player_name, action, params)
     
     # Broadcast action result
     await manager.broadcast({
         "type": "action_performed",
         "player_name": player_name,
         "action": action,
-        "result": result,
-        "state": _game_state_getter() if _game_state_getter else {}
+        "result": result
     })
+    mark_state_dirty()
     
     return JSONResponse(content=result)
 
@@ -202,7 +429,7 @@ _game_resetter = None
 
 
 def setup_game_resetter(resetter):
-    """Setup game reset handler."""
+    """Setup game reset handler (a coroutine function)."""
     global _game_resetter
     _game_resetter = resetter
 
@@ -213,18 +440,129 @@ async def reset_game():
     if _game_resetter is None:
         raise HTTPException(status_code=500, detail="Game reset handler not initialized")
     
-    result = _game_resetter()
+    result = await _game_resetter()
     
     # Broadcast game reset
     await manager.broadcast({
         "type": "game_reset",
-        "message": result,
-        "state": _game_state_getter() if _game_state_getter else {"status": "lobby", "players": []}
-    })
+        "message": result
+    }, get_state_bytes({"status": "lobby", "players": []}))
     
     return JSONResponse(content={"result": result})
 
 
+# --- WebSocket message handlers ---
+
+
+async def _handle_register_player(websocket: WebSocket, data: Dict[str, Any]):
+    player_name = data.get("player_name", "")
+    if _player_registrar:
+        result = await _player_registrar(player_name)
+        await manager.broadcast({
+            "type": "player_registered",
+            "player_name": player_name,
+            "message": result
+        }, get_state_bytes())
+
+
+async def _handle_start_game(websocket: WebSocket, data: Dict[str, Any]):
+    if _game_starter:
+        result = await _game_starter()
+        await manager.broadcast({
+            "type": "game_started",
+            "message": result
+        }, get_state_bytes())
+
+
+async def _handle_action(websocket: WebSocket, data: Dict[str, Any]):
+    player_name = data.get("player_name", "")
+    action = data.get("action", "")
+    params = data.get("params", {})
+    
+    if _game_action_handler:
+        result = await _game_action_handler(player_name, action, params)
+        await manager.broadcast({
+            "type": "action_result",
+            "player_name": player_name,
+            "action": action,
+            "result": result
+        })
+        mark_state_dirty()
+
+
+async def _handle_get_state(websocket: WebSocket, data: Dict[str, Any]):
+    if _game_state_getter:
+        await manager.send_personal(websocket, {
+            "type": "state_update"
+        }, get_state_bytes())
+
+
+async def _handle_reset_game(websocket: WebSocket, data: Dict[str, Any]):
+    if _game_resetter:
+        # Also stop any running agent game
+        if _orchestrator and _orchestrator.is_running:
+            _orchestrator.stop_game()
+        result = await _game_resetter()
+        await manager.broadcast({
+            "type": "game_reset",
+            "message": result
+        }, get_state_bytes({"status": "lobby", "players": []}))
+
+
+async def _handle_start_agent_game(websocket: WebSocket, data: Dict[str, Any]):
+    agent_ids = data.get("agent_ids", [])
+    if _orchestrator and len(agent_ids) >= 2 and len(agent_ids) <= 4:
+        # Reset first
+        if _game_resetter:
+            await _game_resetter()
+        result = await _orchestrator.start_game(agent_ids)
+        await manager.broadcast({
+            "type": "agent_game_started",
+            "result": result
+        }, get_state_bytes())
+    else:
+        await manager.send_personal(websocket, {
+            "type": "error",
+            "message": "Invalid agent selection (need 2-4 agents)"
+        })
+
+
+async def _handle_stop_agent_game(websocket: WebSocket, data: Dict[str, Any]):
+    if _orchestrator:
+        result = _orchestrator.stop_game()
+        await manager.broadcast({
+            "type": "agent_game_stopped",
+            "result": result
+        })
+
+
+async def _handle_get_thoughts(websocket: WebSocket, data: Dict[str, Any]):
+    if _orchestrator:
+        thoughts = _orchestrator.get_recent_thoughts(data.get("limit", 20))
+        await manager.send_personal(websocket, {
+            "type": "thoughts_update",
+            "thoughts": thoughts
+        })
+
+
+async def _handle_ping(websocket: WebSocket, data: Dict[str, Any]):
+    await manager.send_personal(websocket, {"type": "pong"})
+
+
+# Client message type -> handler
+WS_HANDLERS: Dict[str, Callable[[WebSocket, Dict[str, Any]], Awaitable[None]]] = {
+    "register_player": _handle_register_player,
+    "start_game": _handle_start_game,
+    "action": _handle_action,
+    "get_state": _handle_get_state,
+    "reset_game": _handle_reset_game,
+    "start_agent_game": _handle_start_agent_game,
+    "stop_agent_game": _handle_stop_agent_game,
+    "get_thoughts": _handle_get_thoughts,
+    "ping": _handle_ping,
+}
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time game updates."""
@@ -234,110 +572,31 @@ async def websocket_endpoint(websocket: WebSocket):
         # Send initial state
         if _game_state_getter:
             await manager.send_personal(websocket, {
-                "type": "connected",
-                "state": _game_state_getter()
-            })
+                "type": "connected"
+            }, get_state_bytes())
         
         while True:
             # Receive messages from client
-            data = await websocket.receive_json()
-            
-            message_type = data.get("type", "")
-            
-            if message_type == "register_player":
-                player_name = data.get("player_name", "")
-                if _player_registrar:
-                    result = _player_registrar(player_name)
-                    await manager.broadcast({
-                        "type": "player_registered",
-                        "player_name": player_name,
-                        "message": result,
-                        "state": _game_state_getter() if _game_state_getter else {}
-                    })
-            
-            elif message_type == "start_game":
-                if _game_starter:
-                    result = _game_starter()
-                    await manager.broadcast({
-                        "type": "game_started",
-                        "message": result,
-                        "state": _game_state_getter() if _game_state_getter else {}
-                    })
-            
-            elif message_type == "action":
-                player_name = data.get("player_name", "")
-                action = data.get("action", "")
-                params = data.get("params", {})
-                
-                if _game_action_handler:
-                    result = _game_action_handler(player_name, action, params)
-                    await manager.broadcast({
-                        "type": "action_result",
-                        "player_name": player_name,
-                        "action": action,
-                        "result": result,
-                        "state": _game_state_getter() if _game_state_getter else {}
-                    })
-            
-            elif message_type == "get_state":
-                if _game_state_getter:
-                    await manager.send_personal(websocket, {
-                        "type": "state_update",
-                        "state": _game_state_getter()
-                    })
-            
-            elif message_type == "reset_game":
-                if _game_resetter:
-                    # Also stop any running agent game
-                    if _orchestrator and _orchestrator.is_running:
-                        _orchestrator.stop_game()
-                    result = _game_resetter()
-                    await manager.broadcast({
-                        "type": "game_reset",
-                        "message": result,
-                        "state": _game_state_getter() if _game_state_getter else {"status": "lobby", "players": []}
-                    })
-            
-            elif message_type == "start_agent_game":
-                agent_ids = data.get("agent_ids", [])
-                if _orchestrator and len(agent_ids) >= 2 and len(agent_ids) <= 4:
-                    # Reset first
-                    if _game_resetter:
-                        _game_resetter()
-                    result = await _orchestrator.start_game(agent_ids)
-                    await manager.broadcast({
-                        "type": "agent_game_started",
-                        "result": result,
-                        "state": _game_state_getter() if _game_state_getter else {}
-                    })
-                else:
-                    await manager.send_personal(websocket, {
-                        "type": "error",
-                        "message": "Invalid agent selection (need 2-4 agents)"
-                    })
-            
-            elif message_type == "stop_agent_game":
-                if _orchestrator:
-                    result = _orchestrator.stop_game()
-                    await manager.broadcast({
-                        "type": "agent_game_stopped",
-                        "result": result
-                    })
-            
-            elif message_type == "get_thoughts":
-                if _orchestrator:
-                    thoughts = _orchestrator.get_recent_thoughts(data.get("limit", 20))
-                    await manager.send_personal(websocket, {
-                        "type": "thoughts_update",
-                        "thoughts": thoughts
-                    })
+            try:
+                data = orjson.loads(await websocket.receive_text())
+            except orjson.JSONDecodeError:
+                data = None
+            if not isinstance(data, dict):
+                await manager.send_personal(websocket, {
+                    "type": "error",
+                    "message": "Messages must be JSON objects"
+                })
+                continue
             
-            elif message_type == "ping":
-                await manager.send_personal(websocket, {"type": "pong"})
+            handler = WS_HANDLERS.get(data.get("type", ""))
+            if handler:
+                await handler(websocket, data)
     
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+    except CLIENT_GONE_ERRORS:
+        pass
     except Exception as e:
+        print(f"WebSocket handler error: {e!r}")
+    finally:
         manager.disconnect(websocket)
 
 
@@ -373,26 +632,33 @@ def setup_orchestrator(orchestrator):
     _orchestrator = orchestrator
 
 
+# AVAILABLE_AGENTS is static, so the /agents response body is encoded once
+_agents_response: Optional[bytes] = None
+
+
 @router.get("/agents")
 async def get_available_agents():
     """Get list of available AI agents."""
-    from agents.agent_config import AVAILABLE_AGENTS
-    
-    # Return agent info (model-based agents)
-    agents = [
-        {
-            "id": agent["id"],
-            "name": agent["name"],
-            "emoji": agent["emoji"],
-            "color": agent["color"],
-            "provider": agent["provider"],
-            "model_id": agent["model_id"],
-            "description": agent["description"]
-        }
-        for agent in AVAILABLE_AGENTS
-    ]
+    global _agents_response
+    if _agents_response is None:
+        from agents.agent_config import AVAILABLE_AGENTS
+        
+        # Return agent info (model-based agents)
+        agents = [
+            {
+                "id": agent["id"],
+                "name": agent["name"],
+                "emoji": agent["emoji"],
+                "color": agent["color"],
+                "provider": agent["provider"],
+                "model_id": agent["model_id"],
+                "description": agent["description"]
+            }
+            for agent in AVAILABLE_AGENTS
+        ]
+        _agents_response = orjson.dumps({"agents": agents})
     
-    return JSONResponse(content={"agents": agents})
+    return Response(content=_agents_response, media_type="application/json")
 
 
 @router.post("/agents/start-game")
@@ -409,7 +675,7 @@ async def start_agent_game(agent_ids: List[str]):
     
     # Reset the game first
     if _game_resetter:
-        _game_resetter()
+        await _game_resetter()
     
     # Start agent game
     result = await _orchestrator.start_game(agent_ids)
@@ -417,9 +683,8 @@ async def start_agent_game(agent_ids: List[str]):
     # Broadcast game start
     await manager.broadcast({
         "type": "agent_game_started",
-        "result": result,
-        "state": _game_state_getter() if _game_state_getter else {}
-    })
+        "result": result
+    }, get_state_bytes())
     
     return JSONResponse(content=result)
 
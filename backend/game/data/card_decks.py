@@ -1,30 +1,41 @@
-CHANCE_CARDS = [
-    {"type": "move", "to": 0, "text": "Advance to GO"},
-    {"type": "move", "to": 24, "text": "Advance to Illinois Avenue"},
-    {"type": "move", "to": 39, "text": "Advance to Boardwalk"},
-    {"type": "move", "to": 5, "text": "Advance to Reading Railroad"},
-    {"type": "money", "amount": 150, "text": "Bank pays you dividend of $150"},
-    {"type": "money", "amount": -15, "text": "Speeding fine $15"},
-    {"type": "jail_card", "text": "Get Out of Jail Free"},
-    {"type": "go_to_jail", "text": "Go directly to Jail"},
-    {"type": "money", "amount": 50, "text": "Bank pays you $50"},
-    {"type": "move_back", "spaces": 3, "text": "Go back 3 spaces"},
-]
+from typing import NamedTuple, Optional
 
 
-COMMUNITY_CARDS = [
-    {"type": "move", "to": 0, "text": "Advance to GO"},
-    {"type": "money", "amount": 200, "text": "Bank error in your favor, collect $200"},
-    {"type": "money", "amount": -50, "text": "Doctor's fees, pay $50"},
-    {"type": "money", "amount": 100, "text": "You inherit $100"},
-    {"type": "money", "amount": -100, "text": "Pay hospital fees $100"},
-    {"type": "jail_card", "text": "Get Out of Jail Free"},
-    {"type": "go_to_jail", "text": "Go to Jail"},
-    {"type": "money", "amount": 25, "text": "Receive $25 consultancy fee"},
-    {
-        "type": "money",
-        "amount": 10,
-        "text": "You won second prize in beauty contest, collect $10",
-    },
-    {"type": "money", "amount": -150, "text": "Pay school fees $150"},
-]
+class Card(NamedTuple):
+    kind: str
+    text: str
+    amount: Optional[int] = None
+    to: Optional[int] = None
+    spaces: Optional[int] = None
+
+
+CHANCE_CARDS = (
+    Card(kind="move", to=0, text="Advance to GO"),
+    Card(kind="move", to=24, text="Advance to Illinois Avenue"),
+    Card(kind="move", to=39, text="Advance to Boardwalk"),
+    Card(kind="move", to=5, text="Advance to Reading Railroad"),
+    Card(kind="money", amount=150, text="Bank pays you dividend of $150"),
+    Card(kind="money", amount=-15, text="Speeding fine $15"),
+    Card(kind="jail_card", text="Get Out of Jail Free"),
+    Card(kind="go_to_jail", text="Go directly to Jail"),
+    Card(kind="money", amount=50, text="Bank pays you $50"),
+    Card(kind="move_back", spaces=3, text="Go back 3 spaces"),
+)
+
+
+COMMUNITY_CARDS = (
+    Card(kind="move", to=0, text="Advance to GO"),
+    Card(kind="money", amount=200, text="Bank error in your favor, collect $200"),
+    Card(kind="money", amount=-50, text="Doctor's fees, pay $50"),
+    Card(kind="money", amount=100, text="You inherit $100"),
+    Card(kind="money", amount=-100, text="Pay hospital fees $100"),
+    Card(kind="jail_card", text="Get Out of Jail Free"),
+    Card(kind="go_to_jail", text="Go to Jail"),
+    Card(kind="money", amount=25, text="Receive $25 consultancy fee"),
+    Card(
+        kind="money",
+        amount=10,
+        text="You won second prize in beauty contest, collect $10",
+    ),
+    Card(kind="money", amount=-150, text="Pay school fees $150"),
+)
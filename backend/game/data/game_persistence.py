@@ -1,12 +1,35 @@
 """
 Game persistence layer - saves and loads game state to/from JSON files.
 """
-import json
+import atexit
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from pathlib import Path
 
+import orjson
+
+# Keep files indented and stringify non-str keys, as json.dump did
+_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# Block size for reading the history file backwards
+_TAIL_BLOCK_SIZE = 4096
+
+
+def _parse_jsonl(data: bytes) -> List[Any]:
+    """Parse JSON Lines, skipping blank lines and a torn trailing line."""
+    entries = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entries.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            continue
+    return entries
+
 
 class GamePersistence:
     def __init__(self, data_dir: str = None):
@@ -19,13 +42,73 @@ class GamePersistence:
         
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.current_game_file = self.data_dir / "current_game.json"
-        self.game_history_file = self.data_dir / "game_history.json"
+        # Append-only, one game per line, so saving a game doesn't rewrite the whole history
+        self.game_history_file = self.data_dir / "game_history.jsonl"
         self.stats_file = self.data_dir / "game_stats.json"
+        
+        # Parsed file contents keyed by path, reused while (mtime_ns, size) is unchanged
+        self._read_cache: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+        # (history list, (games, total turns, win counts)); valid while the cached history is
+        self._history_totals: Optional[Tuple[list, Tuple[int, int, Dict[str, int]]]] = None
+        
+        self._migrate_legacy_history(self.data_dir / "game_history.json")
+    
+    def _migrate_legacy_history(self, legacy_file: Path) -> None:
+        """Convert a history saved as one JSON array into the JSONL history file."""
+        history = self._read_json(legacy_file)
+        if not isinstance(history, list):
+            return
+        try:
+            # Exclusive create: never overwrite an existing JSONL history
+            with open(self.game_history_file, 'xb') as f:
+                f.writelines(
+                    orjson.dumps(entry, default=str, option=orjson.OPT_NON_STR_KEYS) + b'\n'
+                    for entry in history
+                )
+        except FileExistsError:
+            return
+        os.remove(legacy_file)
+    
+    def _write_json(self, path: Path, data: Any) -> None:
+        """Write JSON atomically, so readers never see a partially written file."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, default=str, option=_DUMP_OPTIONS))
+        os.replace(tmp_path, path)
+    
+    def _read_json(self, path: Path, parse: Callable[[bytes], Any] = orjson.loads) -> Any:
+        """Read and parse a JSON file, or None if missing or invalid.
+        
+        The parsed object is cached until the file changes, so callers must not mutate it.
+        """
+        # One stat serves as both the existence check and the cache key
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._read_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        try:
+            with open(path, 'rb') as f:
+                payload = parse(f.read())
+        except (orjson.JSONDecodeError, IOError):
+            return None
+        self._read_cache[path] = (key, payload)
+        return payload
+    
+    @staticmethod
+    def new_game_id() -> str:
+        """Generate an id for a new game."""
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
     
     def save_game_state(self, game_state: Dict[str, Any], game_id: Optional[str] = None) -> str:
         """Save the current game state to a JSON file."""
         if game_id is None:
-            game_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            game_id = self.new_game_id()
         
         save_data = {
             "game_id": game_id,
@@ -34,51 +117,83 @@ class GamePersistence:
         }
         
         # Save current game state
-        with open(self.current_game_file, 'w') as f:
-            json.dump(save_data, f, indent=2, default=str)
+        self._write_json(self.current_game_file, save_data)
         
         return game_id
     
     def load_game_state(self) -> Optional[Dict[str, Any]]:
         """Load the current game state from JSON file."""
-        if not self.current_game_file.exists():
-            return None
-        
-        try:
-            with open(self.current_game_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return None
+        return self._read_json(self.current_game_file)
     
     def save_game_stats(self, stats: Dict[str, Any]) -> None:
         """Save game statistics (for completed games)."""
-        history = self.load_game_history()
-        history.append({
+        entry = {
             "timestamp": datetime.now().isoformat(),
             **stats
-        })
+        }
         
-        with open(self.game_history_file, 'w') as f:
-            json.dump(history, f, indent=2, default=str)
+        line = orjson.dumps(entry, default=str, option=orjson.OPT_NON_STR_KEYS) + b'\n'
+        with open(self.game_history_file, 'ab+') as f:
+            # A crash mid-append leaves a torn last line; start a fresh one so only it is lost
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    line = b'\n' + line
+            f.write(line)
     
     def load_game_history(self) -> list:
         """Load game history."""
-        if not self.game_history_file.exists():
+        history = self._read_json(self.game_history_file, _parse_jsonl)
+        return history if history is not None else []
+    
+    def load_recent_history(self, n: int = 10) -> list:
+        """Load the last n games, reading the history file backwards from the end."""
+        if n <= 0:
             return []
-        
         try:
-            with open(self.game_history_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+            f = open(self.game_history_file, 'rb')
+        except FileNotFoundError:
             return []
+        
+        with f:
+            pos = f.seek(0, os.SEEK_END)
+            buf = b''
+            # n complete lines need n + 1 newlines once the (partial) first line is dropped
+            while pos > 0 and buf.count(b'\n') <= n:
+                step = min(_TAIL_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+        
+        lines = buf.splitlines()
+        if pos > 0:
+            lines = lines[1:]
+        return _parse_jsonl(b'\n'.join(lines[-n:]))
+    
+    def _get_history_totals(self) -> Tuple[int, int, Dict[str, int]]:
+        """Game count, total turns and win counts over the history, recomputed only when it changes."""
+        history = self.load_game_history()
+        if self._history_totals is not None and self._history_totals[0] is history:
+            return self._history_totals[1]
+        
+        total_turns = sum(g.get("total_turns", 0) for g in history)
+        winners = {}
+        for game in history:
+            winner = game.get("winner")
+            if winner:
+                winners[winner] = winners.get(winner, 0) + 1
+        
+        totals = (len(history), total_turns, winners)
+        self._history_totals = (history, totals)
+        return totals
     
     def get_game_stats_summary(self) -> Dict[str, Any]:
         """Get a summary of all game statistics."""
-        history = self.load_game_history()
+        history_games, total_turns, winners = self._get_history_totals()
         current_game = self.load_game_state()
         all_time_stats = self._load_all_time_stats()
         
-        if not history and all_time_stats.get("total_games", 0) == 0:
+        if not history_games and all_time_stats.get("total_games", 0) == 0:
             return {
                 "total_games": 0,
                 "total_turns_played": 0,
@@ -89,20 +204,12 @@ class GamePersistence:
                 "all_time_stats": all_time_stats
             }
         
-        # Calculate stats from history
-        total_turns = sum(g.get("total_turns", 0) for g in history)
-        winners = {}
-        for game in history:
-            winner = game.get("winner")
-            if winner:
-                winners[winner] = winners.get(winner, 0) + 1
-        
         # Merge with all-time stats
         merged_winners = {**all_time_stats.get("win_counts", {})}
         for player, wins in winners.items():
             merged_winners[player] = merged_winners.get(player, 0) + wins
         
-        total_games = len(history) + all_time_stats.get("total_games", 0)
+        total_games = history_games + all_time_stats.get("total_games", 0)
         all_turns = total_turns + all_time_stats.get("total_turns_played", 0)
         
         return {
@@ -110,31 +217,28 @@ class GamePersistence:
             "total_turns_played": all_turns,
             "average_turns_per_game": all_turns // total_games if total_games else 0,
             "win_counts": merged_winners,
-            "recent_games": history[-10:],  # Last 10 games
+            "recent_games": self.load_recent_history(10),  # Last 10 games
             "current_game": current_game,
             "all_time_stats": all_time_stats
         }
     
     def _load_all_time_stats(self) -> Dict[str, Any]:
         """Load all-time aggregated statistics."""
-        if not self.stats_file.exists():
-            return {"total_games": 0, "total_turns_played": 0, "win_counts": {}}
-        
-        try:
-            with open(self.stats_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+        stats = self._read_json(self.stats_file)
+        if stats is None:
             return {"total_games": 0, "total_turns_played": 0, "win_counts": {}}
+        return stats
     
     def _save_all_time_stats(self, stats: Dict[str, Any]) -> None:
         """Save all-time aggregated statistics."""
-        with open(self.stats_file, 'w') as f:
-            json.dump(stats, f, indent=2, default=str)
+        self._write_json(self.stats_file, stats)
     
     def clear_current_game(self) -> None:
         """Clear the current game state."""
-        if self.current_game_file.exists():
+        try:
             os.remove(self.current_game_file)
+        except FileNotFoundError:
+            pass
     
     def get_current_game_stats(self) -> Dict[str, Any]:
         """Get current game statistics for live display."""
@@ -203,6 +307,63 @@ class GamePersistence:
         }
 
 
+class BackgroundSaver:
+    """
+    Write-behind saves of the current game state.
+    
+    request_save() only records the latest state; a background thread writes it,
+    so a burst of actions costs one file write per interval instead of one each.
+    A thread rather than an asyncio task, since saves are requested from the
+    FastAPI loop, the MCP server thread and orchestrator callback threads.
+    """
+    
+    def __init__(self, persistence: GamePersistence, interval: float = 0.1):
+        self._persistence = persistence
+        self._interval = interval
+        self._pending: Optional[Tuple[Dict[str, Any], str]] = None
+        self._pending_lock = threading.Lock()
+        # Held for the duration of a write, so discard() can't race an in-flight save
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+    
+    def request_save(self, game_state: Dict[str, Any], game_id: str) -> None:
+        """Schedule the state to be saved, replacing any save still pending."""
+        with self._pending_lock:
+            self._pending = (game_state, game_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="game-saver", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+    
+    def flush(self) -> None:
+        """Write the pending state now, if any."""
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, None
+            if pending is not None:
+                self._persistence.save_game_state(*pending)
+    
+    def discard(self) -> None:
+        """Drop any pending save, waiting out one in progress (e.g. before clearing the game)."""
+        with self._write_lock:
+            with self._pending_lock:
+                self._pending = None
+    
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the thread alive: one bad snapshot must not stop later saves
+                print(f"Game save error: {e!r}")
+            time.sleep(self._interval)
+
+
 # Global persistence instance
 persistence = GamePersistence()
+saver = BackgroundSaver(persistence)
 
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Set
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     name: str
     money: int = 1500
@@ -10,5 +10,17 @@ class Player:
     jail_turns: int = 0
     jail_cards: int = 0
     properties: List[int] = field(default_factory=list)
+    properties_mask: int = 0
+    railroad_count: int = 0
+    utility_count: int = 0
+    monopolies: Set[str] = field(default_factory=set)
     bankrupt: bool = False
-    doubles_count: int = 0
\ No newline at end of file
+    doubles_count: int = 0
+
+    def owns(self, position: int) -> bool:
+        """Ownership test against the bitmask; rejects non-int or negative positions."""
+        return (
+            isinstance(position, int)
+            and position >= 0
+            and bool((self.properties_mask >> position) & 1)
+        )
@@ -1,19 +1,33 @@
-from dataclasses import dataclass, field
-from typing import List, Optional
-from game.data.tiles import TileType
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from game.data.tiles import (
+    BOARD_SIZE,
+    TILE_COLORS,
+    TILE_HOUSE_COSTS,
+    TILE_MORTGAGES,
+    TILE_NAMES,
+    TILE_PRICES,
+    TILE_RENTS,
+    TILE_TYPES,
+    ColorGroup,
+    TileType,
+)
 
+# Rent lookup tables indexed by the number owned (index 0 mirrors the old 1-owned default)
+RAILROAD_RENT = (25, 25, 50, 100, 200)
+UTILITY_MULTIPLIER = (4, 4, 10)
 
-@dataclass
+
+@dataclass(slots=True)
 class Property:
-    position: int
     position: int
     name: str
     tile_type: TileType
     price: int = 0
     mortgage_value: int = 0
-    color_group: str = ""
+    color_group: ColorGroup = ColorGroup.NONE
     house_cost: int = 0
-    rent: List[int] = field(default_factory=list)
+    rent: Tuple[int, ...] = ()
     owner: Optional[str] = None
     houses: int = 0
     is_mortgaged: bool = False
@@ -23,24 +37,61 @@ class Property:
     ) -> int:
         if self.is_mortgaged:
             return 0
-        if self.tile_type == TileType.PROPERTY:
+        if self.tile_type is TileType.PROPERTY:
             return self.rent[min(self.houses, 5)]
-        elif self.tile_type == TileType.RAILROAD:
-            rr_rent = {1: 25, 2: 50, 3: 100, 4: 200}
-            return rr_rent.get(railroads_owned, 25)
-        elif self.tile_type == TileType.UTILITY:
-            multiplier = 10 if utilities_owned == 2 else 4
-            return dice_roll * multiplier
+        elif self.tile_type is TileType.RAILROAD:
+            return RAILROAD_RENT[railroads_owned]
+        elif self.tile_type is TileType.UTILITY:
+            return dice_roll * UTILITY_MULTIPLIER[utilities_owned]
         return 0
 
+    def _clone(self) -> "Property":
+        """Unowned copy for a new game; static fields are shared by reference."""
+        return Property(
+            self.position,
+            self.name,
+            self.tile_type,
+            self.price,
+            self.mortgage_value,
+            self.color_group,
+            self.house_cost,
+            self.rent,
+        )
+
+
+# Static board, built once; engines clone these per game
+BASE_TILES: Tuple[Property, ...] = tuple(
+    Property(
+        position=pos,
+        name=TILE_NAMES[pos],
+        tile_type=TILE_TYPES[pos],
+        price=TILE_PRICES[pos],
+        mortgage_value=TILE_MORTGAGES[pos],
+        color_group=TILE_COLORS[pos],
+        house_cost=TILE_HOUSE_COSTS[pos],
+        rent=TILE_RENTS[pos],
+    )
+    for pos in range(BOARD_SIZE)
+)
+
 
 COLOR_GROUPS = {
-    "brown": [1, 3],
-    "light_blue": [6, 8, 9],
-    "pink": [11, 13, 14],
-    "orange": [16, 18, 19],
-    "red": [21, 23, 24],
-    "yellow": [26, 27, 29],
-    "green": [31, 32, 34],
-    "dark_blue": [37, 39],
+    ColorGroup.BROWN: [1, 3],
+    ColorGroup.LIGHT_BLUE: [6, 8, 9],
+    ColorGroup.PINK: [11, 13, 14],
+    ColorGroup.ORANGE: [16, 18, 19],
+    ColorGroup.RED: [21, 23, 24],
+    ColorGroup.YELLOW: [26, 27, 29],
+    ColorGroup.GREEN: [31, 32, 34],
+    ColorGroup.DARK_BLUE: [37, 39],
+}
+
+# Board position -> positions in its color group (empty for non-property tiles)
+GROUP_BY_POS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(COLOR_GROUPS.get(TILE_COLORS[pos], ())) for pos in range(BOARD_SIZE)
+)
+
+# Group membership as position bitmasks, matched against Player.properties_mask
+COLOR_GROUP_MASKS: Dict[ColorGroup, int] = {
+    group: sum(1 << pos for pos in positions) for group, positions in COLOR_GROUPS.items()
 }
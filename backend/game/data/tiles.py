@@ -1,6 +1,18 @@
 from enum import StrEnum
 
 
+class ColorGroup(StrEnum):
+    NONE = ""
+    BROWN = "brown"
+    LIGHT_BLUE = "light_blue"
+    PINK = "pink"
+    ORANGE = "orange"
+    RED = "red"
+    YELLOW = "yellow"
+    GREEN = "green"
+    DARK_BLUE = "dark_blue"
+
+
 class TileType(StrEnum):
     GO = "go"
     PROPERTY = "property"
@@ -55,4 +67,17 @@ TILE_DATA = {
     37: {"name": "Park Place", "type": TileType.PROPERTY, "price": 350, "mortgage": 175, "color": "dark_blue", "house_cost": 200, "rent": [35, 175, 500, 1100, 1300, 1500]},
     38: {"name": "Luxury Tax", "type": TileType.TAX, "amount": 100},
     39: {"name": "Boardwalk", "type": TileType.PROPERTY, "price": 400, "mortgage": 200, "color": "dark_blue", "house_cost": 200, "rent": [50, 200, 600, 1400, 1700, 2000]},
-}
\ No newline at end of file
+}
+
+
+# Per-field tuples indexed by board position (0-39), for hot paths that need one field
+# of one tile. TILE_DATA stays as the readable source these are generated from.
+BOARD_SIZE = len(TILE_DATA)
+TILE_NAMES = tuple(TILE_DATA[pos]["name"] for pos in range(BOARD_SIZE))
+TILE_TYPES = tuple(TILE_DATA[pos]["type"] for pos in range(BOARD_SIZE))
+TILE_PRICES = tuple(TILE_DATA[pos].get("price", 0) for pos in range(BOARD_SIZE))
+TILE_MORTGAGES = tuple(TILE_DATA[pos].get("mortgage", 0) for pos in range(BOARD_SIZE))
+TILE_COLORS = tuple(ColorGroup(TILE_DATA[pos].get("color", "")) for pos in range(BOARD_SIZE))
+TILE_HOUSE_COSTS = tuple(TILE_DATA[pos].get("house_cost", 0) for pos in range(BOARD_SIZE))
+TILE_RENTS = tuple(tuple(TILE_DATA[pos].get("rent", ())) for pos in range(BOARD_SIZE))
+TAX_AMOUNTS = tuple(TILE_DATA[pos].get("amount", 0) for pos in range(BOARD_SIZE))
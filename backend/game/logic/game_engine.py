@@ -1,11 +1,19 @@
+from collections import deque
 from enum import StrEnum
-from typing import Dict, List, Any
+from itertools import islice
+from typing import AbstractSet, Any, Deque, Dict, List, Optional, Set, Tuple
 import random
 
-from game.data.card_decks import CHANCE_CARDS, COMMUNITY_CARDS
+from game.data.card_decks import CHANCE_CARDS, COMMUNITY_CARDS, Card
 from game.data.player import Player
-from game.data.property import COLOR_GROUPS, Property
-from game.data.tiles import TILE_DATA, TileType
+from game.data.property import (
+    BASE_TILES,
+    COLOR_GROUP_MASKS,
+    COLOR_GROUPS,
+    GROUP_BY_POS,
+    Property,
+)
+from game.data.tiles import TAX_AMOUNTS, TileType
 
 
 class GamePhase(StrEnum):
@@ -16,68 +24,106 @@ class GamePhase(StrEnum):
     GAME_OVER = "game_over"
 
 
+# Turn actions offered in each phase (building is added separately)
+PHASE_ACTIONS: Dict[GamePhase, Tuple[str, ...]] = {
+    GamePhase.WAITING_FOR_ROLL: ("roll_dice_and_move",),
+    GamePhase.IN_JAIL: ("roll_for_doubles", "pay_jail_bail"),
+    GamePhase.WAITING_FOR_BUY_DECISION: ("buy_property", "decline_purchase"),
+    GamePhase.TURN_COMPLETE: ("end_turn",),
+}
+
+
+def _shuffled_deck(cards) -> Deque:
+    # random.shuffle indexes from both ends, so shuffle a list and wrap it
+    deck = list(cards)
+    random.shuffle(deck)
+    return deque(deck)
+
+
 class MonopolyGameEngine:
     def __init__(self, player_names: List[str]) -> None:
         self.players: Dict[str, Player] = {}
         self.player_order: List[str] = player_names
-        self.current_player_idx: int = 0
+        # Set in initialize() and on turn change
+        self.current_player: Optional[Player] = None
         self.phase: GamePhase = GamePhase.WAITING_FOR_ROLL
-        self.tiles: Dict[int, Property] = {}
+        self.tiles: List[Property] = []
         self.last_dice: tuple = (0, 0)
         self.turn_number: int = 0
-        self.messages: List[str] = []
+        self.messages: Deque[str] = deque(maxlen=50)
+        # get_full_state memo, invalidated by every mutating action
+        self._state_dirty: bool = True
+        self._cached_state: Dict[str, Any] = {}
+
+        self.chance_deck = _shuffled_deck(CHANCE_CARDS)
+        self.community_deck = _shuffled_deck(COMMUNITY_CARDS)
+        self._randrange = random.randrange
+
+        # Card effects by Card.kind; unknown kinds fall through to _card_noop
+        self._card_handlers = {
+            "money": self._card_money,
+            "move": self._card_move,
+            "move_back": self._card_move_back,
+            "jail_card": self._card_jail_card,
+            "go_to_jail": self._card_go_to_jail,
+        }
 
-        self.chance_deck = CHANCE_CARDS.copy()
-        self.community_deck = COMMUNITY_CARDS.copy()
-        random.shuffle(self.chance_deck)
-        random.shuffle(self.community_deck)
+        # Landing handlers by tile type; GO, jail and free parking fall through to _land_noop
+        self._landing_dispatch = {
+            TileType.GO_TO_JAIL: self._land_go_to_jail,
+            TileType.TAX: self._land_tax,
+            TileType.CHANCE: self._land_card,
+            TileType.COMMUNITY_CHEST: self._land_card,
+            TileType.PROPERTY: self._land_ownable,
+            TileType.RAILROAD: self._land_ownable,
+            TileType.UTILITY: self._land_ownable,
+        }
 
     def initialize(self) -> Dict[str, Any]:
+        self._state_dirty = True
         # creating the players
         for name in self.player_order:
             self.players[name] = Player(name=name)
+        self.current_player = self.players[self.player_order[0]]
+        self._active_players: Set[str] = set(self.player_order)
+        # Circular turn order over players still in the game
+        n = len(self.player_order)
+        self._next_active: Dict[str, str] = {
+            name: self.player_order[(i + 1) % n]
+            for i, name in enumerate(self.player_order)
+        }
 
         # creating the game tiles
-        for pos, data in TILE_DATA.items():
-            prop = Property(
-                position=pos,
-                name=data["name"],
-                tile_type=data["type"],
-                price=data.get("price", 0),
-                mortgage_value=data.get("mortgage", 0),
-                color_group=data.get("color", ""),
-                house_cost=data.get("house_cost", 0),
-                rent=data.get("rent", []),
-            )
+        self.tiles = [tile._clone() for tile in BASE_TILES]
 
-            self.tiles[pos] = prop
+        # At this point, I want to save the game initialization, register the players in the database. save the game stats [WIP]
 
-            # At this point, I want to save the game initialization, register the players in the database. save the game stats [WIP]
-
-            self.messages.append(
-                f"Game started with players: {', '.join(self.player_order)}"
-            )
+        self.messages.append(
+            f"Game started with players: {', '.join(self.player_order)}"
+        )
         return {
             "status": "success",
             "message": f"Game initialized with {len(self.players)} players",
             "players": self.player_order,
         }
 
-    @property
-    def current_player(self) -> Player:
-        return self.players[self.player_order[self.current_player_idx]]
-
     @property
     def current_tile(self) -> Property:
         return self.tiles[self.current_player.position]
 
+    @property
+    def active_players(self) -> AbstractSet[str]:
+        # Kept up to date as players go bankrupt; read-only for callers
+        return self._active_players
+
     def _log(self, msg: str):
         self.messages.append(msg)
-        if len(self.messages) > 50:
-            self.messages = self.messages[-50:]
 
     def get_full_state(self) -> Dict[str, Any]:
-        return {
+        """Snapshot of the game, rebuilt only after a mutation; callers must not modify it."""
+        if not self._state_dirty:
+            return self._cached_state
+        self._cached_state = {
             "phase": self.phase.value,
             "current_player": self.current_player.name,
             "turn_number": self.turn_number,
@@ -85,8 +131,12 @@ class MonopolyGameEngine:
                 name: self._player_to_dict(p) for name, p in self.players.items()
             },
             "last_dice": self.last_dice,
-            "recent_messages": self.messages[-10:],
+            "recent_messages": list(
+                islice(self.messages, max(len(self.messages) - 10, 0), None)
+            ),
         }
+        self._state_dirty = False
+        return self._cached_state
 
     def _player_to_dict(self, p: Player) -> Dict:
         return {
@@ -97,7 +147,7 @@ class MonopolyGameEngine:
             "jail_turns": p.jail_turns,
             "jail_cards": p.jail_cards,
             "properties": [self.tiles[pos].name for pos in p.properties],
-            "property_positions": p.properties,
+            "property_positions": list(p.properties),
             "bankrupt": p.bankrupt,
         }
 
@@ -116,37 +166,34 @@ class MonopolyGameEngine:
         }
 
     def get_available_actions(self) -> Dict[str, Any]:
-        actions = []
         p = self.current_player
-
-        if self.phase == GamePhase.WAITING_FOR_ROLL:
-            actions.append("roll_dice_and_move")
-        elif self.phase == GamePhase.IN_JAIL:
-            actions.extend(["roll_for_doubles", "pay_jail_bail"])
-            if p.jail_cards > 0:
-                actions.append("use_jail_card")
-        elif self.phase == GamePhase.WAITING_FOR_BUY_DECISION:
-            actions.extend(["buy_property", "decline_purchase"])
-
-        elif self.phase == GamePhase.TURN_COMPLETE:
-            actions.append("end_turn")
+        actions = list(PHASE_ACTIONS.get(self.phase, ()))
+        if self.phase is GamePhase.IN_JAIL and p.jail_cards > 0:
+            actions.append("use_jail_card")
 
         # Building actions (can do anytime on your turn)
-        if self.phase not in [GamePhase.GAME_OVER]:
+        buildable = []
+        if self.phase is not GamePhase.GAME_OVER:
             buildable = self._get_buildable_properties(p)
             if buildable:
-                actions.append(f"build_house (on positions: {buildable})")
+                actions.append("build_house")
 
-        return {"current_player": p.name, "phase": self.phase.value, "actions": actions}
+        return {
+            "current_player": p.name,
+            "phase": self.phase.value,
+            "actions": actions,
+            "buildable_positions": buildable,
+        }
 
     def roll_and_move(self) -> Dict[str, Any]:
+        self._state_dirty = True
         if self.phase == GamePhase.IN_JAIL:
             return {"error": "You are in jail. Use jail actions instead."}
         if self.phase != GamePhase.WAITING_FOR_ROLL:
             return {"error": f"Cannot roll now. Current phase: {self.phase.value}"}
 
         p = self.current_player
-        d1, d2 = random.randint(1, 6), random.randint(1, 6)
+        d1, d2 = self._roll_dice()
         self.last_dice = (d1, d2)
         total = d1 + d2
         is_doubles = d1 == d2
@@ -191,97 +238,106 @@ class MonopolyGameEngine:
 
         return result
 
+    def _roll_dice(self) -> tuple:
+        # One draw over the 36 outcomes instead of two randint calls
+        r = self._randrange(36)
+        return r // 6 + 1, r % 6 + 1
+
     def _handle_landing(self, p: Player, tile: Property, dice_total: int) -> Dict:
-        if tile.tile_type == TileType.GO_TO_JAIL:
-            self._send_to_jail(p, "landed on Go To Jail")
-            return {"result": "Go to Jail!"}
-
-        if tile.tile_type == TileType.TAX:
-            amount = TILE_DATA[tile.position].get("amount", 0)
-            p.money -= amount
-            self._log(f"{p.name} paid ${amount} tax")
-            self.phase = GamePhase.TURN_COMPLETE
-            return {"result": f"Paid ${amount} tax"}
+        return self._landing_dispatch.get(tile.tile_type, self._land_noop)(
+            p, tile, dice_total
+        )
 
-        if tile.tile_type in [TileType.CHANCE, TileType.COMMUNITY_CHEST]:
-            return self._draw_card(p, tile.tile_type)
+    def _land_go_to_jail(self, p: Player, tile: Property, dice_total: int) -> Dict:
+        self._send_to_jail(p, "landed on Go To Jail")
+        return {"result": "Go to Jail!"}
 
-        if tile.tile_type in [TileType.PROPERTY, TileType.RAILROAD, TileType.UTILITY]:
-            if tile.owner is None:
-                self.phase = GamePhase.WAITING_FOR_BUY_DECISION
-                return {
-                    "result": "unowned_property",
-                    "price": tile.price,
-                    "can_afford": p.money >= tile.price,
-                }
-            elif tile.owner != p.name:
-                rent = self._calculate_rent(tile, dice_total)
-                p.money -= rent
-                self.players[tile.owner].money += rent
-                self._log(f"{p.name} paid ${rent} rent to {tile.owner}")
-                self.phase = GamePhase.TURN_COMPLETE
-                return {"result": f"Paid ${rent} rent to {tile.owner}"}
-            else:
-                self.phase = GamePhase.TURN_COMPLETE
-                return {"result": "Landed on own property"}
+    def _land_tax(self, p: Player, tile: Property, dice_total: int) -> Dict:
+        amount = TAX_AMOUNTS[tile.position]
+        p.money -= amount
+        self._log(f"{p.name} paid ${amount} tax")
+        self.phase = GamePhase.TURN_COMPLETE
+        return {"result": f"Paid ${amount} tax"}
 
+    def _land_card(self, p: Player, tile: Property, dice_total: int) -> Dict:
+        return self._draw_card(p, tile.tile_type)
+
+    def _land_ownable(self, p: Player, tile: Property, dice_total: int) -> Dict:
+        if tile.owner is None:
+            self.phase = GamePhase.WAITING_FOR_BUY_DECISION
+            return {
+                "result": "unowned_property",
+                "price": tile.price,
+                "can_afford": p.money >= tile.price,
+            }
+        elif tile.owner != p.name:
+            rent = self._calculate_rent(tile, dice_total)
+            p.money -= rent
+            self.players[tile.owner].money += rent
+            self._log(f"{p.name} paid ${rent} rent to {tile.owner}")
+            self.phase = GamePhase.TURN_COMPLETE
+            return {"result": f"Paid ${rent} rent to {tile.owner}"}
+        else:
+            self.phase = GamePhase.TURN_COMPLETE
+            return {"result": "Landed on own property"}
+
+    def _land_noop(self, p: Player, tile: Property, dice_total: int) -> Dict:
         self.phase = GamePhase.TURN_COMPLETE
         return {"result": "Nothing happens"}
 
     def _calculate_rent(self, tile: Property, dice: int) -> int:
         owner = self.players[tile.owner]
-        if tile.tile_type == TileType.RAILROAD:
-            count = sum(
-                1
-                for pos in owner.properties
-                if self.tiles[pos].tile_type == TileType.RAILROAD
-            )
-            return tile.get_rent(railroads_owned=count)
-        elif tile.tile_type == TileType.UTILITY:
-            count = sum(
-                1
-                for pos in owner.properties
-                if self.tiles[pos].tile_type == TileType.UTILITY
-            )
-            return tile.get_rent(dice_roll=dice, utilities_owned=count)
+        if tile.tile_type is TileType.RAILROAD:
+            return tile.get_rent(railroads_owned=owner.railroad_count)
+        elif tile.tile_type is TileType.UTILITY:
+            return tile.get_rent(dice_roll=dice, utilities_owned=owner.utility_count)
         return tile.get_rent()
 
     def _draw_card(self, p: Player, card_type: TileType) -> Dict:
-        deck = self.chance_deck if card_type == TileType.CHANCE else self.community_deck
+        deck = self.chance_deck if card_type is TileType.CHANCE else self.community_deck
+        card = deck.popleft()
+        # Refill as the last card goes, so decks are never empty at draw time
         if not deck:
-            deck = (
-                CHANCE_CARDS if card_type == TileType.CHANCE else COMMUNITY_CARDS
-            ).copy()
-            random.shuffle(deck)
+            deck.extend(
+                _shuffled_deck(
+                    CHANCE_CARDS if card_type is TileType.CHANCE else COMMUNITY_CARDS
+                )
+            )
 
-        card = deck.pop(0)
-        self._log(f"{p.name} drew: {card['text']}")
+        self._log(f"{p.name} drew: {card.text}")
 
-        if card["type"] == "money":
-            p.money += card["amount"]
-            self.phase = GamePhase.TURN_COMPLETE
-            return {"result": card["text"], "money_change": card["amount"]}
-        elif card["type"] == "move":
-            old = p.position
-            p.position = card["to"]
-            if card["to"] < old:
-                p.money += 200
-            self.phase = GamePhase.TURN_COMPLETE
-            return self._handle_landing(p, self.tiles[p.position], sum(self.last_dice))
-        elif card["type"] == "move_back":
-            p.position = (p.position - card["spaces"]) % 40
-            self.phase = GamePhase.TURN_COMPLETE
-            return self._handle_landing(p, self.tiles[p.position], sum(self.last_dice))
-        elif card["type"] == "jail_card":
-            p.jail_cards += 1
-            self.phase = GamePhase.TURN_COMPLETE
-            return {"result": "Received Get Out of Jail Free card"}
-        elif card["type"] == "go_to_jail":
-            self._send_to_jail(p, "card")
-            return {"result": "Go to Jail!"}
+        return self._card_handlers.get(card.kind, self._card_noop)(p, card)
 
+    def _card_money(self, p: Player, card: Card) -> Dict:
+        p.money += card.amount
         self.phase = GamePhase.TURN_COMPLETE
-        return {"result": card["text"]}
+        return {"result": card.text, "money_change": card.amount}
+
+    def _card_move(self, p: Player, card: Card) -> Dict:
+        old = p.position
+        p.position = card.to
+        if card.to < old:
+            p.money += 200
+        self.phase = GamePhase.TURN_COMPLETE
+        return self._handle_landing(p, self.tiles[p.position], sum(self.last_dice))
+
+    def _card_move_back(self, p: Player, card: Card) -> Dict:
+        p.position = (p.position - card.spaces) % 40
+        self.phase = GamePhase.TURN_COMPLETE
+        return self._handle_landing(p, self.tiles[p.position], sum(self.last_dice))
+
+    def _card_jail_card(self, p: Player, card: Card) -> Dict:
+        p.jail_cards += 1
+        self.phase = GamePhase.TURN_COMPLETE
+        return {"result": "Received Get Out of Jail Free card"}
+
+    def _card_go_to_jail(self, p: Player, card: Card) -> Dict:
+        self._send_to_jail(p, "card")
+        return {"result": "Go to Jail!"}
+
+    def _card_noop(self, p: Player, card: Card) -> Dict:
+        self.phase = GamePhase.TURN_COMPLETE
+        return {"result": card.text}
 
     def _send_to_jail(self, p: Player, reason: str):
         p.position = 10
@@ -292,6 +348,7 @@ class MonopolyGameEngine:
         self._log(f"{p.name} sent to jail ({reason})")
 
     def buy_current_property(self) -> Dict[str, Any]:
+        self._state_dirty = True
         if self.phase != GamePhase.WAITING_FOR_BUY_DECISION:
             return {"error": "No property available to buy"}
 
@@ -304,6 +361,15 @@ class MonopolyGameEngine:
         p.money -= tile.price
         tile.owner = p.name
         p.properties.append(tile.position)
+        p.properties_mask |= 1 << tile.position
+        if tile.tile_type is TileType.RAILROAD:
+            p.railroad_count += 1
+        elif tile.tile_type is TileType.UTILITY:
+            p.utility_count += 1
+        else:
+            group_mask = COLOR_GROUP_MASKS[tile.color_group]
+            if p.properties_mask & group_mask == group_mask:
+                p.monopolies.add(tile.color_group)
         self._log(f"{p.name} bought {tile.name} for ${tile.price}")
         self.phase = GamePhase.TURN_COMPLETE
 
@@ -315,6 +381,7 @@ class MonopolyGameEngine:
         }
 
     def decline_purchase(self) -> Dict[str, Any]:
+        self._state_dirty = True
         if self.phase != GamePhase.WAITING_FOR_BUY_DECISION:
             return {"error": "No property to decline"}
         tile = self.current_tile
@@ -329,6 +396,7 @@ class MonopolyGameEngine:
         }
 
     def pay_bail(self) -> Dict[str, Any]:
+        self._state_dirty = True
         p = self.current_player
         if not p.in_jail:
             return {"error": "Not in jail"}
@@ -343,6 +411,7 @@ class MonopolyGameEngine:
         return {"success": True, "remaining_money": p.money}
 
     def use_jail_card(self) -> Dict[str, Any]:
+        self._state_dirty = True
         p = self.current_player
         if not p.in_jail:
             return {"error": "Not in jail"}
@@ -357,11 +426,12 @@ class MonopolyGameEngine:
         return {"success": True}
 
     def roll_for_doubles(self) -> Dict[str, Any]:
+        self._state_dirty = True
         p = self.current_player
         if not p.in_jail:
             return {"error": "Not in jail"}
 
-        d1, d2 = random.randint(1, 6), random.randint(1, 6)
+        d1, d2 = self._roll_dice()
         self.last_dice = (d1, d2)
         self._log(f"{p.name} rolled [{d1}][{d2}] trying for doubles")
 
@@ -384,30 +454,34 @@ class MonopolyGameEngine:
         self.phase = GamePhase.TURN_COMPLETE
         return {"dice": [d1, d2], "escaped": False, "turns_remaining": 3 - p.jail_turns}
 
+    def _can_build_on(self, p: Player, tile: Property) -> bool:
+        # Needs the full group, room for another house, no mortgage, even building and the cash
+        if tile.color_group not in p.monopolies or tile.houses >= 5 or tile.is_mortgaged:
+            return False
+        if p.money < tile.house_cost:
+            return False
+        return tile.houses <= min(self.tiles[g].houses for g in GROUP_BY_POS[tile.position])
+
     def _get_buildable_properties(self, p: Player) -> List[int]:
         buildable = []
-        for pos in p.properties:
-            tile = self.tiles[pos]
-            if (
-                tile.tile_type != TileType.PROPERTY
-                or tile.houses >= 5
-                or tile.is_mortgaged
-            ):
+        if not p.monopolies:
+            return buildable
+        for group, positions in COLOR_GROUPS.items():
+            if group not in p.monopolies:
                 continue
-            group = COLOR_GROUPS.get(tile.color_group, [])
-            if all(g in p.properties for g in group):
-                min_houses = min(self.tiles[g].houses for g in group)
-                if tile.houses <= min_houses and p.money >= tile.house_cost:
+            for pos in positions:
+                if self._can_build_on(p, self.tiles[pos]):
                     buildable.append(pos)
         return buildable
 
     def build_house(self, position: int) -> Dict[str, Any]:
+        self._state_dirty = True
         p = self.current_player
-        if position not in p.properties:
+        if not p.owns(position):
             return {"error": "You don't own this property"}
 
         tile = self.tiles[position]
-        if position not in self._get_buildable_properties(p):
+        if not self._can_build_on(p, tile):
             return {
                 "error": "Cannot build here. Check monopoly ownership and even building rules."
             }
@@ -425,8 +499,9 @@ class MonopolyGameEngine:
         }
 
     def mortgage_property(self, position: int) -> Dict[str, Any]:
+        self._state_dirty = True
         p = self.current_player
-        if position not in p.properties:
+        if not p.owns(position):
             return {"error": "You don't own this property"}
 
         tile = self.tiles[position]
@@ -442,8 +517,9 @@ class MonopolyGameEngine:
         return {"success": True, "property": tile.name, "received": tile.mortgage_value}
 
     def unmortgage_property(self, position: int) -> Dict[str, Any]:
+        self._state_dirty = True
         p = self.current_player
-        if position not in p.properties:
+        if not p.owns(position):
             return {"error": "You don't own this property"}
 
         tile = self.tiles[position]
@@ -461,6 +537,7 @@ class MonopolyGameEngine:
         return {"success": True, "property": tile.name, "cost": cost}
 
     def end_turn(self) -> Dict[str, Any]:
+        self._state_dirty = True
         if self.phase not in [GamePhase.TURN_COMPLETE]:
             return {"error": f"Cannot end turn in phase: {self.phase.value}"}
 
@@ -468,25 +545,25 @@ class MonopolyGameEngine:
         p.doubles_count = 0
 
         # Check bankruptcy
+        next_name = self._next_active[p.name]
         if p.money < 0:
             p.bankrupt = True
             self._log(f"{p.name} is BANKRUPT!")
+            # Splice the player out of the turn order
+            prev = next(n for n, nxt in self._next_active.items() if nxt == p.name)
+            self._next_active[prev] = next_name
+            del self._next_active[p.name]
+            self._active_players.discard(p.name)
 
         # Move to next player
-        active = [n for n in self.player_order if not self.players[n].bankrupt]
-        if len(active) <= 1:
+        if len(self._active_players) <= 1:
             self.phase = GamePhase.GAME_OVER
-            winner = active[0] if active else None
+            winner = next(iter(self._active_players), None)
             return {"game_over": True, "winner": winner}
 
-        self.current_player_idx = (self.current_player_idx + 1) % len(self.player_order)
-        while self.players[self.player_order[self.current_player_idx]].bankrupt:
-            self.current_player_idx = (self.current_player_idx + 1) % len(
-                self.player_order
-            )
-
         self.turn_number += 1
-        new_player = self.current_player
+        new_player = self.players[next_name]
+        self.current_player = new_player
         self.phase = (
             GamePhase.IN_JAIL if new_player.in_jail else GamePhase.WAITING_FOR_ROLL
         )
@@ -499,7 +576,7 @@ class MonopolyGameEngine:
         }
 
     def get_property_info(self, position: int) -> Dict[str, Any]:
-        if position not in self.tiles:
+        if not 0 <= position < len(self.tiles):
             return {"error": "Invalid position"}
         t = self.tiles[position]
         return {
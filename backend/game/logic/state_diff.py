@@ -0,0 +1,64 @@
+"""
+Shallow game-state diffs for sending websocket patches instead of full states.
+"""
+from typing import Any, Dict, Optional
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Shallow diff between two game states: top-level keys whose value changed,
+    with the players map narrowed to the players that changed.
+    Returns None when the state shape changed and a full state must be sent.
+    """
+    if old.keys() != new.keys():
+        return None
+    patch = {}
+    for key, value in new.items():
+        old_value = old[key]
+        if key == "players" and isinstance(value, dict) and isinstance(old_value, dict):
+            if old_value.keys() != value.keys():
+                return None
+            changed = {name: info for name, info in value.items() if old_value[name] != info}
+            if changed:
+                patch[key] = changed
+        elif old_value != value:
+            patch[key] = value
+    return patch
+
+
+class PatchBaseline:
+    """
+    The last state every websocket client was sent, shared by all broadcast paths so a
+    patch is always diffed against a state the clients actually hold.
+    Every full_state_every-th payload carries the full state to bound any drift.
+    """
+
+    def __init__(self, full_state_every: int = 20):
+        self.full_state_every = full_state_every
+        self._state: Optional[Dict[str, Any]] = None
+        self._patches_since_full = 0
+
+    def payload(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """State part of a broadcast to everyone: {"patch": ...} when possible, else {"state": ...}."""
+        last_state = self._state
+        self._state = state
+        if last_state is not None and self._patches_since_full < self.full_state_every:
+            patch = diff_state(last_state, state)
+            if patch is not None:
+                self._patches_since_full += 1
+                return {"patch": patch}
+        self._patches_since_full = 0
+        return {"state": state}
+
+    def mark_full(self, state: Dict[str, Any]):
+        """Record that this full state was just sent to everyone."""
+        self._state = state
+        self._patches_since_full = 0
+
+    def reset(self):
+        """Forget the baseline (a state went out without it), so the next payload is full."""
+        self._state = None
+
+
+# Shared by the debounced route flushes and the agent orchestrator
+broadcast_baseline = PatchBaseline()
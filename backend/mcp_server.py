@@ -1,23 +1,41 @@
 from fastmcp import FastMCP
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any, List, Optional
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 import threading
 import asyncio
+import sys
 
 # Import your existing engine
 from game.logic.game_engine import MonopolyGameEngine, GamePhase
-from game.data.game_persistence import persistence
-from api.routes import router as api_router, setup_game_handlers, setup_game_resetter, get_connection_manager, setup_orchestrator
+from game.data.game_persistence import persistence, saver
+from api.routes import router as api_router, setup_game_handlers, setup_game_resetter, get_connection_manager, setup_orchestrator, invalidate_state_cache, get_state_bytes
 from agents.game_orchestrator import orchestrator
 
 mcp = FastMCP("Monopoly Game Server")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _broadcast_loop
+    # Sync callers hand their broadcasts to the serving loop
+    with _broadcast_loop_lock:
+        _broadcast_loop = asyncio.get_running_loop()
+    yield
+    # Shutdown: close the orchestrator's LLM connection pool
+    await orchestrator.aclose()
+    # Write any state still pending in the saver rather than leaving it to atexit
+    await asyncio.to_thread(saver.flush)
+
+
 # Create FastAPI app for REST + WebSocket endpoints
 app = FastAPI(
     title="Monopoly Game API",
     description="REST and WebSocket API for the Monopoly game",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware for frontend
@@ -33,7 +51,8 @@ app.add_middleware(
 # --- Global Server State ---
 class ServerState:
     def __init__(self):
-        self.registered_players: List[str] = []
+        # Insertion-ordered set of names (dict keys), in join order
+        self.registered_players: Dict[str, None] = {}
         self.game_engine: Optional[MonopolyGameEngine] = None
         self.is_game_started: bool = False
         self.game_id: Optional[str] = None
@@ -42,40 +61,59 @@ class ServerState:
         self.actions_this_turn: int = 0
         self.max_actions_per_turn: int = 20
         self.max_turns: int = 100
-        self.lock = threading.Lock()
+        # Set once the game has ended, so later actions skip the final stats save
+        self.terminal_response: Optional[Dict[str, Any]] = None
+        # Bumped on every state change; broadcasts carry it so clients can spot stale state
+        self.revision: int = 0
+        # Latest published state, replaced (never mutated) after each change so readers
+        # can take it without the lock
+        self.latest_snapshot: Dict[str, Any] = {"status": "lobby", "players": []}
+        # Game handlers all run on the one serving loop (MCP tools included), so a
+        # cooperative lock is enough
+        self.lock = asyncio.Lock()
 
 
 state = ServerState()
 
-# Global event loop reference for async broadcasting
+# Event loop that sync contexts hand broadcasts to: the serving loop once the app has
+# started, otherwise one shared background loop started on first use
 _broadcast_loop: Optional[asyncio.AbstractEventLoop] = None
+_broadcast_loop_lock = threading.Lock()
+
 
+def _get_broadcast_loop() -> asyncio.AbstractEventLoop:
+    """Get the broadcast loop, starting the shared background loop if none is set."""
+    global _broadcast_loop
+    with _broadcast_loop_lock:
+        if _broadcast_loop is None or _broadcast_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="broadcast-loop", daemon=True).start()
+            _broadcast_loop = loop
+        return _broadcast_loop
 
-def _broadcast_to_clients(update_type: str, data: Dict[str, Any]):
+
+def _broadcast_to_clients(
+    update_type: str, data: Dict[str, Any], state_bytes: Optional[bytes] = None
+):
     """
     Broadcast game updates to all connected WebSocket clients.
     This bridges the sync MCP context to the async WebSocket broadcasting.
+    state_bytes is game state already encoded by get_state_bytes, sent under "state".
     """
     try:
         manager = get_connection_manager()
         message = {"type": update_type, **data}
         
-        # Try to get the running event loop
-        try:
-            asyncio.get_running_loop()
-            # If we're in an async context, create a task
-            asyncio.create_task(manager.broadcast(message))
-        except RuntimeError:
+        # Each client has its own send queue and writer task, so a broadcast only
+        # enqueues the frame; no task is needed per message
+        # _get_running_loop returns None outside a loop rather than raising
+        if asyncio._get_running_loop() is None:
             # No running event loop - we're in a sync context
-            # Use the global broadcast loop if available
-            global _broadcast_loop
-            if _broadcast_loop and _broadcast_loop.is_running():
-                asyncio.run_coroutine_threadsafe(manager.broadcast(message), _broadcast_loop)
-            else:
-                # Create a new event loop in a thread
-                def run_broadcast():
-                    asyncio.run(manager.broadcast(message))
-                threading.Thread(target=run_broadcast, daemon=True).start()
+            _get_broadcast_loop().call_soon_threadsafe(
+                manager.broadcast_nowait, message, state_bytes
+            )
+        else:
+            manager.broadcast_nowait(message, state_bytes)
     except Exception as e:
         print(f"Broadcast error: {e}")
 
@@ -83,16 +121,40 @@ def _broadcast_to_clients(update_type: str, data: Dict[str, Any]):
 # --- Helper Functions (Ported from game_runner.py) ---
 
 
+# Clients send a handful of distinct action strings
+@lru_cache(maxsize=128)
 def _clean_action_name(action: str) -> str:
     """
     Ported from game_runner.py:
-    Cleans up action name (remove annotations like '(on positions: [1, 3])')
+    Cleans up action name (remove annotations like '(on positions: [1, 3])').
+    The engine now lists plain names, but clients may still echo the old form.
     """
     if "(" in action:
         action = action.split("(")[0].strip()
     return action.replace(" ", "_")
 
 
+# Engine call per runner action, taking (game, params)
+_ACTION_DISPATCH = {
+    "roll_dice_and_move": lambda game, params: game.roll_and_move(),
+    "buy_property": lambda game, params: game.buy_current_property(),
+    "decline_purchase": lambda game, params: game.decline_purchase(),
+    "pay_jail_bail": lambda game, params: game.pay_bail(),
+    "use_jail_card": lambda game, params: game.use_jail_card(),
+    "roll_for_doubles": lambda game, params: game.roll_for_doubles(),
+    "build_house": lambda game, params: game.build_house(
+        params.get("property_position", 0)
+    ),
+    "mortgage": lambda game, params: game.mortgage_property(
+        params.get("property_position", 0)
+    ),
+    "unmortgage": lambda game, params: game.unmortgage_property(
+        params.get("property_position", 0)
+    ),
+    "end_turn": lambda game, params: game.end_turn(),
+}
+
+
 def _execute_runner_action(
     game: MonopolyGameEngine, action: str, params: Dict
 ) -> Dict[str, Any]:
@@ -100,34 +162,45 @@ def _execute_runner_action(
     Ported from game_runner.py: execute_action
     Maps string actions to engine methods.
     """
-    action_map = {
-        "roll_dice_and_move": lambda: game.roll_and_move(),
-        "buy_property": lambda: game.buy_current_property(),
-        "decline_purchase": lambda: game.decline_purchase(),
-        "pay_jail_bail": lambda: game.pay_bail(),
-        "use_jail_card": lambda: game.use_jail_card(),
-        "roll_for_doubles": lambda: game.roll_for_doubles(),
-        "build_house": lambda: game.build_house(params.get("property_position", 0)),
-        "mortgage": lambda: game.mortgage_property(
-            params.get("property_position", 0)
-        ),
-        "unmortgage": lambda: game.unmortgage_property(
-            params.get("property_position", 0)
-        ),
-        "end_turn": lambda: game.end_turn(),
-    }
-
-    if action in action_map:
-        return action_map[action]()
+    handler = _ACTION_DISPATCH.get(action)
+    if handler is not None:
+        return handler(game, params)
     return {"error": f"Unknown action: {action}"}
 
 
-def _save_game_state():
-    """Helper to save current game state to persistence."""
+def _save_game_state(snapshot: Dict[str, Any]):
+    """Helper to save a game state snapshot (from get_full_state) to persistence."""
     if state.is_game_started and state.game_engine:
-        game_state = state.game_engine.get_full_state()
-        game_state["registered_players"] = state.registered_players
-        state.game_id = persistence.save_game_state(game_state, state.game_id)
+        # The engine's snapshot is shared, so extend a copy
+        game_state = {**snapshot, "registered_players": list(state.registered_players)}
+        if state.game_id is None:
+            state.game_id = persistence.new_game_id()
+        # Written behind by the saver thread, off the request path
+        saver.request_save(game_state, state.game_id)
+
+
+# Broadcast data for a handler result, plus the new state (None when unchanged)
+BroadcastPayload = Tuple[Dict[str, Any], Optional[Dict[str, Any]]]
+
+
+def _payload(data: Dict[str, Any], snapshot: Optional[Dict[str, Any]]) -> BroadcastPayload:
+    """Build a handler's broadcast payload, stamped with the current state revision."""
+    data["state_revision"] = state.revision
+    return data, snapshot
+
+
+def _broadcast_payload(update_type: str, payload: BroadcastPayload):
+    """Broadcast a payload built by a handler, encoding the state only if it changed."""
+    data, snapshot = payload
+    # Encoded state is shared with /api/status and websocket reads until the next change
+    state_bytes = get_state_bytes(snapshot=snapshot) if snapshot is not None else None
+    _broadcast_to_clients(update_type, data, state_bytes)
+
+
+def _discard_saved_game():
+    """Drop any pending save and remove the current game file; blocks on disk."""
+    saver.discard()
+    persistence.clear_current_game()
 
 
 # --- API Helper Functions (for routes.py integration) ---
@@ -135,50 +208,101 @@ def _save_game_state():
 
 def get_game_state_for_api() -> Dict[str, Any]:
     """Get game state for API endpoints."""
-    if not state.is_game_started:
-        return {"status": "lobby", "players": state.registered_players}
-    return state.game_engine.get_full_state()
+    return state.latest_snapshot
 
 
-def register_player_for_api(player_name: str) -> str:
-    """Register player via API."""
-    with state.lock:
-        if state.is_game_started:
-            return "Error: Game has already started."
-        if player_name in state.registered_players:
-            return f"Error: Player '{player_name}' is already registered."
+def _publish_snapshot() -> Dict[str, Any]:
+    """Snapshot the state after a change and publish it to readers; call under the lock."""
+    if state.is_game_started:
+        snapshot = state.game_engine.get_full_state()
+    else:
+        snapshot = {"status": "lobby", "players": list(state.registered_players)}
+    state.latest_snapshot = snapshot
+    return snapshot
 
-        state.registered_players.append(player_name)
-        return f"Success: {player_name} joined. Total: {len(state.registered_players)}"
+
+async def register_player_for_api(player_name: str) -> str:
+    """Register player via API."""
+    result, _ = await _register_player(player_name)
+    return result
 
 
-def start_game_for_api() -> str:
+async def _register_player(player_name: str) -> Tuple[str, BroadcastPayload]:
+    """Register a player; also returns the broadcast payload."""
+    async with state.lock:
+        snapshot = None
+        if state.is_game_started:
+            result = "Error: Game has already started."
+        elif player_name in state.registered_players:
+            result = f"Error: Player '{player_name}' is already registered."
+        else:
+            state.registered_players[player_name] = None
+            state.revision += 1
+            invalidate_state_cache()
+            result = f"Success: {player_name} joined. Total: {len(state.registered_players)}"
+            snapshot = _publish_snapshot()
+        return result, _payload({"player_name": player_name, "message": result}, snapshot)
+
+
+async def start_game_for_api() -> str:
     """Start game via API."""
-    with state.lock:
+    result, _ = await _start_game()
+    return result
+
+
+async def _start_game() -> Tuple[str, BroadcastPayload]:
+    """Start the game; also returns the broadcast payload."""
+    async with state.lock:
         if state.is_game_started:
-            return "Error: Game already running."
+            result = "Error: Game already running."
+            return result, _payload({"message": result}, None)
         if len(state.registered_players) < 2:
-            return "Error: Need at least 2 players."
+            result = "Error: Need at least 2 players."
+            return result, _payload({"message": result}, None)
 
-        state.game_engine = MonopolyGameEngine(state.registered_players)
+        state.game_engine = MonopolyGameEngine(list(state.registered_players))
         init_res = state.game_engine.initialize()
 
         state.is_game_started = True
         state.actions_this_turn = 0
+        state.terminal_response = None
         
-        _save_game_state()
+        state.revision += 1
+        snapshot = _publish_snapshot()
+        _save_game_state(snapshot)
+        invalidate_state_cache()
         
-        return f"Game Started! Players: {init_res['players']}"
+        result = f"Game Started! Players: {init_res['players']}"
+        return result, _payload({"message": result}, snapshot)
 
 
-def perform_action_for_api(player_name: str, action: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+async def perform_action_for_api(
+    player_name: str, action: str, params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """Perform action via API."""
+    result, _ = await _perform_action(player_name, action, params)
+    return result
+
+
+async def _perform_action(
+    player_name: str, action: str, params: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], BroadcastPayload]:
+    """Perform an action; also returns the broadcast payload."""
+    result, snapshot = await _run_action(player_name, action, params)
+    data = {"player_name": player_name, "action": action, "result": result}
+    return result, _payload(data, snapshot)
+
+
+async def _run_action(
+    player_name: str, action: str, params: Optional[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Run an action under the lock; returns the result and the new state, or None if unchanged."""
     if params is None:
         params = {}
     
-    with state.lock:
+    async with state.lock:
         if not state.is_game_started:
-            return {"error": "Game not started"}
+            return {"error": "Game not started"}, None
 
         game = state.game_engine
 
@@ -186,77 +310,88 @@ def perform_action_for_api(player_name: str, action: str, params: Dict[str, Any]
         if game.current_player.name != player_name:
             return {
                 "error": f"Not your turn. Current player: {game.current_player.name}"
-            }
+            }, None
 
         # 2. Check Game Over / Max Turns
+        if state.terminal_response is not None:
+            return state.terminal_response, None
         if game.phase == GamePhase.GAME_OVER or game.turn_number >= state.max_turns:
-            # Save final game stats
-            final_state = game.get_full_state()
-            persistence.save_game_stats({
-                "game_id": state.game_id,
-                "final_state": final_state,
-                "total_turns": game.turn_number,
-                "winner": _get_winner(game)
-            })
-            return {"error": "Game is over", "game_over": True}
+            return await _finish_game(game), None
 
-        # 3. Clean Input (Runner Logic)
+        # 3. Execute (Runner Logic)
         clean_action = _clean_action_name(action)
-
-        # 4. Execute (Runner Logic)
         result = _execute_runner_action(game, clean_action, params)
+        forced = _count_action(game, player_name, clean_action, result)
+        # Rejected actions leave the game untouched unless the turn was forced over
+        if "error" in result and not forced:
+            return result, None
 
-        # 5. Update Runner State (actions_this_turn)
-        state.actions_this_turn += 1
+        # Save state after each action; the same snapshot goes out in the broadcast
+        state.revision += 1
+        snapshot = _publish_snapshot()
+        _save_game_state(snapshot)
+        invalidate_state_cache()
 
-        # Check for Turn End
-        if clean_action == "end_turn" or game.phase == GamePhase.GAME_OVER:
-            state.actions_this_turn = 0
+        return result, snapshot
 
-        # Safety Valve: Force end turn if stuck
-        if state.actions_this_turn > state.max_actions_per_turn:
-            game._log(f"Forced end turn for {player_name} (max actions exceeded)")
-            game.end_turn()
-            state.actions_this_turn = 0
-            result["warning"] = "Turn ended automatically due to action limit."
 
-        # Save state after each action
-        _save_game_state()
-
-        return result
+def _count_action(
+    game: MonopolyGameEngine, player_name: str, clean_action: str, result: Dict[str, Any]
+) -> bool:
+    """Update actions_this_turn, forcing the turn over past the limit; returns True if forced."""
+    if clean_action == "end_turn" or game.phase == GamePhase.GAME_OVER:
+        state.actions_this_turn = 0
+        return False
+
+    state.actions_this_turn += 1
+    if state.actions_this_turn <= state.max_actions_per_turn:
+        return False
+
+    # Safety Valve: Force end turn if stuck
+    game._log(f"Forced end turn for {player_name} (max actions exceeded)")
+    game.end_turn()
+    state.actions_this_turn = 0
+    result["warning"] = "Turn ended automatically due to action limit."
+    return True
+
+
+async def _finish_game(game: MonopolyGameEngine) -> Dict[str, Any]:
+    """Save the final stats once the game has ended and cache the game-over response."""
+    # History append runs off the event loop
+    await asyncio.to_thread(persistence.save_game_stats, {
+        "game_id": state.game_id,
+        "final_state": game.get_full_state(),
+        "total_turns": game.turn_number,
+        "winner": _get_winner(game)
+    })
+    state.terminal_response = {"error": "Game is over", "game_over": True}
+    return state.terminal_response
 
 
 def _get_winner(game: MonopolyGameEngine) -> Optional[str]:
     """Get the winner of the game."""
-    active = [name for name, player in game.players.items() if not player.bankrupt]
-    return active[0] if len(active) == 1 else None
+    active = game.active_players
+    return next(iter(active)) if len(active) == 1 else None
 
 
 # --- MCP Tools ---
 
 
 @mcp.tool
-def register_as_player(player_name: str) -> str:
+async def register_as_player(player_name: str) -> str:
     """Register a new player. Only allowed BEFORE game starts."""
-    result = register_player_for_api(player_name)
+    result, payload = await _register_player(player_name)
     # Broadcast player registration to all clients
-    _broadcast_to_clients("player_registered", {
-        "player_name": player_name,
-        "message": result,
-        "state": get_game_state_for_api()
-    })
+    _broadcast_payload("player_registered", payload)
     return result
 
 
 @mcp.tool
-def start_game() -> str:
+async def start_game() -> str:
     """Starts the game if at least 2 players are registered."""
-    result = start_game_for_api()
+    result, payload = await _start_game()
     # Broadcast game start to all clients
-    _broadcast_to_clients("game_started", {
-        "message": result,
-        "state": get_game_state_for_api()
-    })
+    _broadcast_payload("game_started", payload)
     return result
 
 
@@ -268,7 +403,7 @@ def get_game_state() -> Dict[str, Any]:
 
 @mcp.tool
 def get_my_available_actions(player_name: str) -> Dict[str, Any]:
-    """Get valid actions for a specific player."""
+    """Get valid actions for a specific player; build_house targets are listed in buildable_positions."""
     if not state.is_game_started:
         return {"error": "Game not started"}
 
@@ -280,20 +415,15 @@ def get_my_available_actions(player_name: str) -> Dict[str, Any]:
 
 
 @mcp.tool
-def perform_action(
-    player_name: str, action: str, params: Dict[str, Any] = {}
+async def perform_action(
+    player_name: str, action: str, params: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Executes an action using the Game Runner logic (cleaning inputs, checking limits).
     """
-    result = perform_action_for_api(player_name, action, params)
+    result, payload = await _perform_action(player_name, action, params)
     # Broadcast action result to all clients
-    _broadcast_to_clients("action_result", {
-        "player_name": player_name,
-        "action": action,
-        "result": result,
-        "state": get_game_state_for_api()
-    })
+    _broadcast_payload("action_result", payload)
     return result
 
 
@@ -304,24 +434,27 @@ def get_game_stats() -> Dict[str, Any]:
 
 
 @mcp.tool
-def reset_game() -> str:
+async def reset_game() -> str:
     """Reset the game to initial state (lobby)."""
-    result = reset_game_for_api()
+    result, payload = await _reset_game()
     # Broadcast game reset to all clients
-    _broadcast_to_clients("game_reset", {
-        "message": result,
-        "state": {"status": "lobby", "players": []}
-    })
+    _broadcast_payload("game_reset", payload)
     return result
 
 
-def reset_game_for_api() -> str:
+async def reset_game_for_api() -> str:
     """Reset game via API."""
-    with state.lock:
+    result, _ = await _reset_game()
+    return result
+
+
+async def _reset_game() -> Tuple[str, BroadcastPayload]:
+    """Reset the game; also returns the broadcast payload."""
+    async with state.lock:
         # Save final state if game was in progress
         if state.is_game_started and state.game_engine:
             final_state = state.game_engine.get_full_state()
-            persistence.save_game_stats({
+            await asyncio.to_thread(persistence.save_game_stats, {
                 "game_id": state.game_id,
                 "final_state": final_state,
                 "total_turns": state.game_engine.turn_number,
@@ -330,15 +463,20 @@ def reset_game_for_api() -> str:
             })
         
         # Reset state
-        state.registered_players = []
+        state.registered_players = {}
         state.game_engine = None
         state.is_game_started = False
         state.game_id = None
         state.actions_this_turn = 0
+        state.terminal_response = None
+        state.revision += 1
         
-        persistence.clear_current_game()
+        # Make sure a pending save can't recreate the file after it is cleared
+        await asyncio.to_thread(_discard_saved_game)
+        invalidate_state_cache()
         
-        return "Game reset successfully. Ready for new players."
+        result = "Game reset successfully. Ready for new players."
+        return result, _payload({"message": result}, _publish_snapshot())
 
 
 # Setup API handlers
@@ -346,7 +484,8 @@ setup_game_handlers(
     state_getter=get_game_state_for_api,
     action_handler=perform_action_for_api,
     player_registrar=register_player_for_api,
-    game_starter=start_game_for_api
+    game_starter=start_game_for_api,
+    revision_getter=lambda: state.revision
 )
 
 # Setup reset handler
@@ -375,27 +514,33 @@ async def health_check():
 if __name__ == "__main__":
     import uvicorn
 
-    # Run both MCP server and FastAPI
-    # Option 1: Run MCP with SSE (for MCP clients) + FastAPI on different port
-    
-    def run_fastapi():
-        global _broadcast_loop
-        # Create a new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        _broadcast_loop = loop
-        
-        config = uvicorn.Config(app, host="0.0.0.0", port=8001, loop="asyncio")
+    # Run the MCP server (SSE, for MCP clients) and FastAPI on different ports, on one event loop
+    async def main():
+        # No permessage-deflate: frames are small JSON messages fanned out to every client
+        config = uvicorn.Config(
+            app, host="0.0.0.0", port=8001, http="httptools", ws_per_message_deflate=False
+        )
         server = uvicorn.Server(config)
-        loop.run_until_complete(server.serve())
-    
-    # Start FastAPI in a separate thread
-    api_thread = threading.Thread(target=run_fastapi, daemon=True)
-    api_thread.start()
-    
-    print("FastAPI server running on http://0.0.0.0:8001")
-    print("WebSocket endpoint: ws://localhost:8001/api/ws")
-    print("MCP server running on http://0.0.0.0:8000")
-    
-    # Run MCP server (blocking)
-    mcp.run(transport="sse", port=8000, host="0.0.0.0")
+
+        print("FastAPI server running on http://0.0.0.0:8001")
+        print("WebSocket endpoint: ws://localhost:8001/api/ws")
+        print("MCP server running on http://0.0.0.0:8000")
+
+        # Named so task dumps and profilers can tell the two servers apart
+        await asyncio.gather(
+            asyncio.create_task(server.serve(), name="fastapi-server"),
+            asyncio.create_task(
+                mcp.run_async(transport="sse", port=8000, host="0.0.0.0"), name="mcp-server"
+            ),
+        )
+
+    # libuv event loop where available (uvloop doesn't support Windows)
+    try:
+        if sys.platform == "win32":
+            asyncio.run(main())
+        else:
+            import uvloop
+            uvloop.run(main())
+    except KeyboardInterrupt:
+        # Both servers have shut down; uvicorn re-raises the signal on exit
+        pass
@@ -2,6 +2,7 @@
 Railway entry point - runs FastAPI server on the PORT environment variable.
 """
 import os
+import sys
 import uvicorn
 
 # Import the FastAPI app and all setup from mcp_server
@@ -19,6 +20,12 @@ if __name__ == "__main__":
         app, 
         host="0.0.0.0", 
         port=port, 
-        log_level="info"
+        log_level="info",
+        # libuv event loop for the websocket fan-out (uvloop doesn't support Windows)
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        # C HTTP parser
+        http="httptools",
+        # Frames are small JSON messages; compressing each one per client costs more CPU than it saves
+        ws_per_message_deflate=False
     )
 
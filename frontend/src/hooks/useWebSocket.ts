@@ -1,10 +1,29 @@
 "use client";
 
 import { useState, useEffect, useCallback, useRef } from "react";
-import { GameState, WebSocketMessage, ActionResult, AgentThought } from "@/types/game";
+import { GameState, GameStatePatch, WebSocketMessage, ActionResult, AgentThought } from "@/types/game";
 
 const WS_URL = process.env.NEXT_PUBLIC_WS_URL || "ws://localhost:8001/api/ws";
 
+// Merge a state diff into the current state (players are merged per player)
+function applyStatePatch(prev: GameState | null, patch: GameStatePatch): GameState | null {
+  if (!prev) {
+    return prev;
+  }
+  const { players, ...rest } = patch;
+  const next: GameState = { ...prev, ...rest };
+  if (players) {
+    const prevPlayers = Array.isArray(prev.players) ? {} : prev.players;
+    next.players = { ...prevPlayers, ...players };
+  }
+  return next;
+}
+
+// Whether a frame brings a state or patch, directly or inside a batch
+function carriesState(data: WebSocketMessage): boolean {
+  return Boolean(data.state || data.patch || data.events?.some((e) => e.state || e.patch));
+}
+
 interface UseWebSocketReturn {
   isConnected: boolean;
   gameState: GameState | null;
@@ -29,6 +48,8 @@ export function useWebSocket(): UseWebSocketReturn {
   const [thoughts, setThoughts] = useState<AgentThought[]>([]);
   const [isAgentGameRunning, setIsAgentGameRunning] = useState(false);
   const wsRef = useRef<WebSocket | null>(null);
+  // Server state revision of the last state or patch applied
+  const revisionRef = useRef<number | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
 
   const connect = useCallback(() => {
@@ -37,6 +58,90 @@ export function useWebSocket(): UseWebSocketReturn {
     }
 
     try {
+      // Track the state revision; a newer one on a frame without state means a
+      // state frame was missed, so pull the current state
+      const checkRevision = (data: WebSocketMessage) => {
+        const revision = data.state_revision;
+        if (revision === undefined) {
+          return;
+        }
+        if (carriesState(data)) {
+          revisionRef.current = revision;
+        } else if (revisionRef.current === null || revision > revisionRef.current) {
+          revisionRef.current = revision;
+          wsRef.current?.send(JSON.stringify({ type: "get_state" }));
+        }
+      };
+
+      // Apply one server message to local state
+      const handleMessage = (data: WebSocketMessage) => {
+        switch (data.type) {
+          case "connected":
+          case "state_update":
+            if (data.state) {
+              setGameState(data.state);
+            }
+            break;
+          case "player_registered":
+          case "game_started":
+          case "action_result":
+          case "action_performed":
+            if (data.state) {
+              setGameState(data.state);
+            } else if (data.patch) {
+              const patch = data.patch;
+              setGameState((prev) => applyStatePatch(prev, patch));
+            }
+            if (data.result) {
+              setLastResult(data.result);
+            }
+            break;
+          case "state_patch":
+            if (data.patch) {
+              const patch = data.patch;
+              setGameState((prev) => applyStatePatch(prev, patch));
+            }
+            break;
+          case "game_reset":
+            if (data.state) {
+              setGameState(data.state);
+            }
+            setLastResult(null);
+            setThoughts([]);
+            setIsAgentGameRunning(false);
+            break;
+          case "agent_game_started":
+            if (data.state) {
+              setGameState(data.state);
+            }
+            setIsAgentGameRunning(true);
+            setThoughts([]);
+            break;
+          case "agent_game_stopped":
+            setIsAgentGameRunning(false);
+            break;
+          case "agent_thought":
+            if (data.thought) {
+              setThoughts((prev) => [...prev.slice(-99), data.thought as AgentThought]);
+            }
+            break;
+          case "thoughts_update":
+            if (data.thoughts) {
+              setThoughts(data.thoughts);
+            }
+            break;
+          case "batch":
+            // Several events coalesced into one frame, in order
+            data.events?.forEach(handleMessage);
+            break;
+          case "pong":
+            // Heartbeat response
+            break;
+          default:
+            console.log("Unknown message type:", data.type);
+        }
+      };
+
       const ws = new WebSocket(WS_URL);
 
       ws.onopen = () => {
@@ -48,59 +153,8 @@ export function useWebSocket(): UseWebSocketReturn {
         try {
           const data: WebSocketMessage = JSON.parse(event.data);
           console.log("WS Message:", data);
-
-          switch (data.type) {
-            case "connected":
-            case "state_update":
-              if (data.state) {
-                setGameState(data.state);
-              }
-              break;
-            case "player_registered":
-            case "game_started":
-            case "action_result":
-            case "action_performed":
-              if (data.state) {
-                setGameState(data.state);
-              }
-              if (data.result) {
-                setLastResult(data.result);
-              }
-              break;
-            case "game_reset":
-              if (data.state) {
-                setGameState(data.state);
-              }
-              setLastResult(null);
-              setThoughts([]);
-              setIsAgentGameRunning(false);
-              break;
-            case "agent_game_started":
-              if (data.state) {
-                setGameState(data.state);
-              }
-              setIsAgentGameRunning(true);
-              setThoughts([]);
-              break;
-            case "agent_game_stopped":
-              setIsAgentGameRunning(false);
-              break;
-            case "agent_thought":
-              if (data.thought) {
-                setThoughts((prev) => [...prev.slice(-99), data.thought as AgentThought]);
-              }
-              break;
-            case "thoughts_update":
-              if (data.thoughts) {
-                setThoughts(data.thoughts);
-              }
-              break;
-            case "pong":
-              // Heartbeat response
-              break;
-            default:
-              console.log("Unknown message type:", data.type);
-          }
+          handleMessage(data);
+          checkRevision(data);
         } catch (err) {
           console.error("Failed to parse WS message:", err);
         }
@@ -58,9 +58,15 @@ export interface ActionResult {
   warning?: string;
 }
 
+// Partial game state: changed top-level fields, with only the changed players
+export type GameStatePatch = Partial<Omit<GameState, "players">> & {
+  players?: Record<string, Player>;
+};
+
 export interface WebSocketMessage {
   type: string;
   state?: GameState;
+  patch?: GameStatePatch;
   message?: string;
   player_name?: string;
   action?: string;
@@ -68,6 +74,8 @@ export interface WebSocketMessage {
   thought?: AgentThought;
   thoughts?: AgentThought[];
   agent_ids?: string[];
+  events?: WebSocketMessage[];
+  state_revision?: number;
 }
 
 export interface TileData {